@@ -0,0 +1,183 @@
+"""
+页面启动与重跑性能测试（使用 Streamlit 的本地 AppTest 运行 wangye.py，不启动浏览器）。
+
+测量三类耗时并写入 JSON 报告：
+    import      每个模块在全新 Python 进程中的导入耗时
+    cold_start  全新进程中 导入 Streamlit + 首次运行 wangye.py 到页面渲染完成的耗时
+    pages       侧边栏每个页面（数据提取/数据校验/数据匹配/其他工具）首次切换和之后重跑的耗时
+
+用法：
+    python benchmark.py                                 # 写入 benchmark_report.json
+    python benchmark.py --baseline old_report.json      # 与旧报告比较，变慢超过容差时返回非 0
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(BASE_DIR, "wangye.py")
+REPORT_FILE = "benchmark_report.json"
+
+# 侧边栏页面（与 wangye.py 中 st.radio 的选项一致）
+PAGES = ["📁 数据提取", "✅ 数据校验", "🔗 数据匹配", "🛠️ 其他工具"]
+
+# 单独测量导入耗时的模块
+IMPORT_MODULES = [
+    "streamlit", "pandas", "openpyxl",
+    "sjcl", "sjcl.reference_data", "sjcl.remarks", "sjcl.word_typos", "sjcl.xueyeqiao", "sjcl.score",
+    "sjcl.segmentation", "sjcl.group_code", "sjcl.plan", "sjcl.images",
+]
+
+# AppTest 单次运行的超时（秒）
+RUN_TIMEOUT = 120
+
+_IMPORT_CODE = """
+import sys, time
+sys.path.insert(0, {base!r})
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+_COLD_START_CODE = """
+import sys, time
+sys.path.insert(0, {base!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout={timeout})
+at.run()
+elapsed = time.perf_counter() - start
+print(elapsed if not at.exception else -1)
+"""
+
+
+def _run_child(code):
+    """在全新的 Python 进程中运行 code，返回其最后一行输出的耗时（秒）"""
+    result = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"子进程运行失败：{result.stderr.strip()[-500:]}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _summary(samples):
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+def measure_imports(repeat):
+    """每个模块在全新进程中导入 repeat 次"""
+    report = {}
+    for module in IMPORT_MODULES:
+        samples = [_run_child(_IMPORT_CODE.format(base=BASE_DIR, module=module)) for _ in range(repeat)]
+        report[module] = _summary(samples)
+    return report
+
+
+def measure_cold_start(repeat):
+    """全新进程中从导入 Streamlit 到 wangye.py 首次渲染完成"""
+    samples = [_run_child(_COLD_START_CODE.format(base=BASE_DIR, app=APP_FILE, timeout=RUN_TIMEOUT))
+               for _ in range(repeat)]
+    if any(s < 0 for s in samples):
+        raise Exception("wangye.py 首次运行出现异常")
+    return _summary(samples)
+
+
+def measure_pages(repeat):
+    """同一会话中依次切换到每个页面：记录首次切换耗时和之后 repeat 次重跑的耗时"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_FILE, default_timeout=RUN_TIMEOUT)
+    at.run()
+    report = {}
+    for page in PAGES:
+        start = time.perf_counter()
+        at.sidebar.radio[0].set_value(page).run()
+        first = time.perf_counter() - start
+        if at.exception:
+            raise Exception(f"页面 {page} 运行出现异常：{at.exception[0].message}")
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - start)
+        report[page] = {"first": first, "rerun": _summary(samples)}
+    return report
+
+
+def run_benchmark(repeat=5, cold_repeat=3):
+    import streamlit
+    import pandas
+
+    return {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "streamlit": streamlit.__version__,
+        "pandas": pandas.__version__,
+        "snapshot_exists": os.path.exists(os.path.join(BASE_DIR, "reference_data.pkl")),
+        "import": measure_imports(cold_repeat),
+        "cold_start": measure_cold_start(cold_repeat),
+        "pages": measure_pages(repeat),
+    }
+
+
+def _flatten(report):
+    """报告中用于比较的中位数耗时：名称 → 秒"""
+    values = {f"import {m}": v["median"] for m, v in report.get("import", {}).items()}
+    if "cold_start" in report:
+        values["cold_start"] = report["cold_start"]["median"]
+    for page, v in report.get("pages", {}).items():
+        values[f"{page} first"] = v["first"]
+        values[f"{page} rerun"] = v["rerun"]["median"]
+    return values
+
+
+def compare_reports(report, baseline, tolerance, min_delta):
+    """返回比旧报告变慢超过 tolerance（比例）且超过 min_delta（秒）的项：[(名称, 旧值, 新值)]"""
+    old = _flatten(baseline)
+    regressions = []
+    for name, value in _flatten(report).items():
+        if name in old and value > old[name] * (1 + tolerance) and value - old[name] > min_delta:
+            regressions.append((name, old[name], value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="wangye.py 启动与页面重跑性能测试")
+    parser.add_argument("--output", default=os.path.join(BASE_DIR, REPORT_FILE), help="JSON 报告路径")
+    parser.add_argument("--repeat", type=int, default=5, help="每个页面重跑次数")
+    parser.add_argument("--cold-repeat", type=int, default=3, help="冷启动和模块导入的测量次数")
+    parser.add_argument("--baseline", help="用于比较的旧报告")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许变慢的比例")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="忽略小于该秒数的变慢")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.repeat, args.cold_repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    for name, value in _flatten(report).items():
+        print(f"{name}: {value * 1000:.1f} ms")
+    print(f"报告已写入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance, args.min_delta)
+        for name, old, new in regressions:
+            print(f"变慢：{name} {old * 1000:.1f} ms → {new * 1000:.1f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,7 +23,7 @@ class GitPushApp:
         frame_files.pack(fill="x", padx=20, pady=10)
 
         self.file_vars = {}
-        self.files = ["requirements.txt", "school_data.xlsx", "wangye.py", "招生专业.xlsx"]
+        self.files = ["requirements.txt", "school_data.xlsx", "wangye.py", "sjcl", "招生专业.xlsx"]
 
         for f in self.files:
             var = tk.BooleanVar()
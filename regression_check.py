@@ -0,0 +1,263 @@
+"""
+处理结果一致性检查：优化后的实现与原实现在同一批数据上逐条比较，不启动页面。
+
+检查五项，任一项不一致时列出前几条差异并返回非 0：
+    typos     错别字自动机与原来按 TYPO_DICT 顺序逐个替换的结果（含一个错别字替换后与后面文字组成另一个错别字的连锁情况）
+    remarks   analyze_and_fix（单遍切分）与 _analyze_and_fix_multipass（原来的逐步处理）对每条备注的结果
+    export    build_export_frame（按列生成）与 map_upload_row_to_export（逐行映射）生成的导出数据
+    dedup     process_chunk 处理全部行的结果与只处理不同的行再展开到重复行的结果（学业桥去重）
+    convert   convert_data 整批转换与逐行单独转换的结果（招生计划去重）
+
+语料由固定随机种子生成（参考数据中的学校和专业、TYPO_DICT 和 CUSTOM_WHITELIST 中的词、各种括号和标点），
+同一份参考数据下每次运行相同；可用 --upload 指定学业桥上传文件，同时检查真实数据。
+
+用法：
+    python regression_check.py
+    python regression_check.py --upload 学业桥上传.xlsx
+"""
+import os
+import sys
+import random
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from sjcl.indexes import split_major_combo
+from sjcl.plan import convert_data
+from sjcl.reference_data import get_reference_data
+from sjcl.remarks import CUSTOM_WHITELIST, TYPO_DICT, TypoCorrector, _analyze_and_fix_multipass, analyze_and_fix
+from sjcl.row_cache import fingerprint_rows
+from sjcl.xueyeqiao import (build_export_frame, map_upload_row_to_export, process_chunk,
+                            process_chunk_columns, process_chunk_input_columns)
+
+# 固定的随机种子
+SEED = 20261017
+
+# 每项检查显示的差异条数
+SHOW_DIFFS = 5
+
+# 备注语料的片段：括号、标点、换行与常见备注用词
+REMARK_PIECES = [
+    '（', '）', '(', ')', '【', '】', '《', '》', '{', '}', '（（', '））', '，', '、', '。', '；', ';', ',', '.', '!', '？',
+    ' ', '  ', '\n', '学费', '5000元/年', '4万', '中外合作', '办学', '只招', '英语考生', '色盲色弱慎报', '方向', '含',
+    '师范类', '非师范', '授予', '学士学位', '5+3', '一体化', '在', '就读', '实验班', '（中外合作办学）',
+]
+
+
+def _same(a, b):
+    """两个值相同（都为空值也算相同）"""
+    if isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b):
+        return True
+    return type(a) is type(b) and a == b
+
+
+def _random_remark(rng):
+    pieces = REMARK_PIECES + sorted(TYPO_DICT) + sorted(CUSTOM_WHITELIST)
+    return ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 10)))
+
+
+def chained_typos():
+    """
+    一个错别字替换后与相邻文字组成另一个错别字的备注（如"5十3体化"：'5十3'→'5+3' 后 '5+3体化' 又是错别字），
+    由 TYPO_DICT 中每对错别字生成：前者的替换结果的尾部与后者的开头重合，或前者的替换结果的开头与后者的尾部重合
+    """
+    texts = []
+    for typo, correct in TYPO_DICT.items():
+        for other in TYPO_DICT:
+            for k in range(1, min(len(correct) + 1, len(other))):
+                if correct[-k:] == other[:k]:
+                    texts.append(typo + other[k:])
+                if correct[:k] == other[-k:]:
+                    texts.append(other[:-k] + typo)
+    return sorted(set(texts))
+
+
+def remark_corpus(count, seed=SEED):
+    """随机拼接的备注（固定种子），另加 TYPO_DICT、CUSTOM_WHITELIST 中的每个词和连锁的错别字"""
+    rng = random.Random(seed)
+    return (sorted(TYPO_DICT) + sorted(CUSTOM_WHITELIST) + chained_typos()
+            + [_random_remark(rng) for _ in range(count)])
+
+
+def upload_corpus(reference, count, duplicate_ratio=0.3, seed=SEED):
+    """
+    学业桥上传格式的数据（固定种子）：学校和专业取自参考数据，部分改成别名、加括号后缀或改错，
+    约 duplicate_ratio 的行是前面某行的副本（只改 招生计划人数 等 process_chunk 不读取的列）。
+    """
+    rng = random.Random(seed)
+    schools = sorted(reference.school_names)
+    majors = [split_major_combo(combo) for combo in sorted(reference.major_combos)]
+    levels = sorted({level for _, level in majors if level})
+    provinces = ['北京', '河北', '江苏', '广东', '湖南', '重庆', '上海', '海南']
+    categories = ['物理', '历史', '物理类', '历史类', '理科', '文科', '综合', '']
+    requirements = ['不限', '物理', '化学', '物理和化学', '物理或化学', '思想政治', '物理、化学和生物', '']
+    rows = []
+    for _ in range(count):
+        if rows and rng.random() < duplicate_ratio:
+            row = dict(rng.choice(rows))
+            row['招生计划人数'] = str(rng.randint(1, 50))
+            rows.append(row)
+            continue
+        school = rng.choice(schools)
+        original = rng.choice([school, school + '（本部）', '某某' + school[2:], ''])
+        major, level = rng.choice(majors)
+        major = rng.choice([major, major + '（中外合作办学）', major + '(珠海校区)', major[:-1] + '学', ''])
+        high, low = rng.randint(450, 700), rng.randint(400, 650)
+        rows.append({
+            '数据类型': '专业分', '年份': '2026', '省份': rng.choice(provinces), '批次': '本科批',
+            '科类': rng.choice(categories), '院校名称': rng.choice([school, school + '大学', school]),
+            '院校原始名称': original, '招生代码': f"{rng.randint(1, 9999):04d}", '专业组编号': rng.choice(['', '01', '(02)', '3']),
+            '专业代码': f"{rng.randint(1, 99):02d}", '招生类型': rng.choice(['普通类', '国家专项', '中外合作办学']),
+            '专业名称': major, '一级层次': rng.choice([level, level, rng.choice(levels), '']),
+            '报考要求': rng.choice(requirements), '专业备注': rng.choice(['', '', _random_remark(rng)]),
+            '招生计划人数': str(rng.randint(1, 50)), '最低分': str(low), '最低位次': str(rng.randint(1, 90000)),
+            '最高分': rng.choice([str(high), '', '-']), '平均分': rng.choice([str((high + low) // 2), '', str(high + 1)]),
+            '录取人数': str(rng.randint(1, 50)),
+        })
+    return pd.DataFrame(rows)
+
+
+def _read_upload(path):
+    """与 process_remarks_file 相同的方式读取上传文件"""
+    df = pd.read_excel(path, header=0, dtype={'招生代码': str, '专业组编号': str, '专业代码': str},
+                       engine='openpyxl', keep_default_na=False)
+    for col in ['招生代码', '专业组编号', '专业代码']:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    return df
+
+
+def _replace_in_order(text):
+    """原来的错别字修正：按 TYPO_DICT 的顺序逐个 str.replace"""
+    found = []
+    for typo, correct in TYPO_DICT.items():
+        if typo in text:
+            text = text.replace(typo, correct)
+            found.append((typo, correct))
+    return text, found
+
+
+def check_typos(remarks):
+    """错别字自动机与逐个替换：返回差异 [(备注, 自动机结果, 逐个替换结果)]"""
+    corrector = TypoCorrector(TYPO_DICT)
+    diffs = []
+    for text in dict.fromkeys(str(remark) for remark in remarks):
+        actual, expected = corrector.correct(text), _replace_in_order(text)
+        if actual != expected:
+            diffs.append((text, actual, expected))
+    return diffs
+
+
+def check_remarks(remarks):
+    """analyze_and_fix 与 _analyze_and_fix_multipass：返回差异 [(备注, 单遍结果, 多遍结果)]"""
+    diffs = []
+    for text in dict.fromkeys(remarks):
+        fused = analyze_and_fix(text)
+        multipass = _analyze_and_fix_multipass(text)
+        if not (_same(fused[0], multipass[0]) and list(fused[1]) == list(multipass[1])):
+            diffs.append((text, fused, multipass))
+    return diffs
+
+
+def check_export(processed):
+    """build_export_frame 与逐行的 map_upload_row_to_export：返回差异 [(行号, 列名, 按列结果, 逐行结果)]"""
+    columnwise = build_export_frame(processed)
+    diffs = []
+    for position, (_, row) in enumerate(processed.iterrows()):
+        expected = map_upload_row_to_export(row.to_dict())
+        for header, value in expected.items():
+            actual = columnwise[header].iloc[position]
+            if not _same(actual, value):
+                diffs.append((position, header, actual, value))
+    return diffs
+
+
+def check_dedup(df, reference):
+    """
+    process_chunk 处理全部行与只处理不同的行（按 process_chunk 读取的列的指纹）再展开：
+    返回差异 [(行号, 列名, 去重结果, 全部处理结果)]
+    """
+    full = process_chunk_columns(df.copy(), reference)
+    codes, _ = pd.factorize(fingerprint_rows(df[process_chunk_input_columns(df)]))
+    _, distinct = np.unique(codes, return_index=True)
+    deduped = process_chunk_columns(df.iloc[distinct].copy(), reference)
+    diffs = []
+    if list(full) != list(deduped):
+        return [(None, '列', list(deduped), list(full))]
+    for col in full:
+        expanded = np.asarray(deduped[col], dtype=object)[codes]
+        for position, (actual, expected) in enumerate(zip(expanded, np.asarray(full[col], dtype=object))):
+            if not _same(actual, expected):
+                diffs.append((position, col, actual, expected))
+    return diffs
+
+
+def check_convert(source_data):
+    """convert_data 整批转换与逐行单独转换：返回差异 [(行号, 整批结果, 逐行结果)]"""
+    batch = convert_data(source_data)
+    diffs = []
+    for position, (row, converted) in enumerate(zip(source_data, batch)):
+        single = convert_data([row])[0]
+        if converted != single:
+            diffs.append((position, converted, single))
+    return diffs
+
+
+def plan_corpus(upload):
+    """由上传格式数据构造招生计划格式的行（convert_data 的输入），含完全重复的行"""
+    rows = []
+    for record in upload.to_dict('records'):
+        rows.append({
+            '学校': record.get('院校名称'), '省份': record.get('省份'), '专业': record.get('专业名称'),
+            '科类': record.get('科类'), '批次': record.get('批次'), '招生类型': record.get('招生类型'),
+            '备注': record.get('专业备注'), '招生人数': record.get('招生计划人数'), '层次': record.get('一级层次', ''),
+            '招生代码': record.get('招生代码'), '专业代码': record.get('专业代码'), '专业组代码': record.get('专业组编号'),
+            '专业组选科要求': record.get('报考要求'),
+            '专业选科要求(新高考专业省份)': '', '数据来源': '',
+        })
+    return rows + rows[::3]
+
+
+def run_checks(upload, remark_count):
+    """对一份上传格式数据运行五项检查，返回 {检查名: 差异列表}"""
+    reference = get_reference_data()
+    remarks = remark_corpus(remark_count) + list(upload['专业备注'])
+    processed = process_chunk(upload.copy(), reference)
+    return {
+        'typos': check_typos(remarks),
+        'remarks': check_remarks(remarks),
+        'export': check_export(processed),
+        'dedup': check_dedup(upload, reference),
+        'convert': check_convert(plan_corpus(upload)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="优化后的实现与原实现的处理结果一致性检查")
+    parser.add_argument("--rows", type=int, default=3000, help="生成的学业桥数据行数")
+    parser.add_argument("--remarks", type=int, default=20000, help="生成的随机备注条数")
+    parser.add_argument("--upload", help="额外检查的学业桥上传文件")
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    datasets = [('生成数据', upload_corpus(get_reference_data(), args.rows))]
+    if args.upload:
+        datasets.append((args.upload, _read_upload(args.upload)))
+    failed = False
+    for name, upload in datasets:
+        results = run_checks(upload, args.remarks)
+        for check, diffs in results.items():
+            print(f"{name} {check}: {'一致' if not diffs else f'{len(diffs)} 处不一致'}")
+            for diff in diffs[:SHOW_DIFFS]:
+                print(f"    {diff!r}")
+            failed = failed or bool(diffs)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+数据处理引擎（不依赖 Streamlit，可直接导入、测试和做性能测试）。
+
+各子模块按功能划分，pandas / openpyxl / requests / bs4 / PIL 等依赖只在用到的子模块或函数中导入；
+`import sjcl` 本身不导入任何子模块，访问 sjcl.process_remarks_file 等名称时才加载对应子模块。
+
+    sjcl.reference_data  参考数据（有效学校名称、专业组合）加载、快照与热更新
+    sjcl.remarks         专业备注检查与修正
+    sjcl.xueyeqiao       学业桥数据处理
+    sjcl.indexes         学校名称 / 招生专业的查找索引（建议、前缀匹配）
+    sjcl.aliases         院校原始名称 → 官方学校名称 别名索引
+    sjcl.pool            学业桥数据处理的常驻进程池
+    sjcl.row_cache       学业桥数据处理的按行结果缓存（重新上传时只处理修改过的行）
+    sjcl.word_typos      专业备注词级错别字检测（jieba 分词，后台预加载）
+    sjcl.remark_clusters 同一学校、省份内近似重复备注的聚类（MinHash / LSH）与规范写法建议
+    sjcl.factorize       按不同取值执行的列转换（map_unique）
+    sjcl.score           院校分提取（普通类 / 艺体类）
+    sjcl.segmentation    一分一段数据处理
+    sjcl.group_code      专业组代码匹配
+    sjcl.plan            招生计划数据比对与转换
+    sjcl.images          就业质量报告图片提取
+"""
+import importlib
+
+# 名称 -> 所在子模块
+_EXPORTS = {
+    'get_reference_data': 'reference_data',
+    'start_reference_watcher': 'reference_data',
+    'reference_cache_stats': 'reference_data',
+    'resource_path': 'reference_data',
+    'load_reference_version': 'reference_data',
+    'diff_reference_versions': 'reference_data',
+    'analyze_and_fix': 'remarks',
+    'analyze_and_fix_cached': 'remarks',
+    'remark_cache_stats': 'remarks',
+    'suggest_canonical_remarks': 'remark_clusters',
+    'check_school_name': 'xueyeqiao',
+    'check_major_combo': 'xueyeqiao',
+    'map_upload_row_to_export': 'xueyeqiao',
+    'build_export_frame': 'xueyeqiao',
+    'convert_group_codes': 'xueyeqiao',
+    'process_chunk': 'xueyeqiao',
+    'process_remarks_file': 'xueyeqiao',
+    'revalidate_remarks_file': 'xueyeqiao',
+    'process_score_file': 'score',
+    'process_new_template_file': 'score',
+    'process_segmentation_file': 'segmentation',
+    'process_data': 'group_code',
+    'export_match_result_to_excel': 'group_code',
+    'compare_plan_vs_score': 'plan',
+    'compare_plan_vs_college': 'plan',
+    'filter_unmatched_plan_data_for_college_export': 'plan',
+    'convert_data': 'plan',
+    'convert_to_college_score_format': 'plan',
+    'export_college_score_data_to_excel': 'plan',
+    'export_converted_data_to_excel': 'plan',
+    'fetch_images_static': 'images',
+    'images_to_pdf': 'images',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
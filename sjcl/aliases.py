@@ -0,0 +1,106 @@
+"""
+学校别名索引：院校原始名称 → 官方学校名称（学业桥上传文件中的 院校原始名称 列）。
+
+每次学业桥数据处理后，从"院校名称匹配、院校原始名称与之不同"的行中学习别名，保存到
+school_aliases.json（哈希表）。之后院校名称不匹配时先用院校原始名称查别名，O(1) 即可解析，
+无需模糊搜索。同一原始名称出现过多个官方名称时取出现次数最多的一个。
+别名文件被其他进程（如进程池中的主进程）更新后，下次获取索引时重新加载。
+"""
+import os
+import json
+import logging
+import threading
+
+from .reference_data import resource_path
+
+ALIAS_FILE = "school_aliases.json"
+
+
+def _file_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class SchoolAliasIndex:
+    """院校原始名称 → {官方名称: 出现次数}，resolve 使用预先算好的 原始名称 → 官方名称 哈希表"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._resolved = {}
+        self.mtime = _file_mtime(path)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._counts = json.load(f)
+            except Exception as e:
+                logging.warning(f"读取学校别名文件 {path} 失败，将重新学习：{e}")
+                self._counts = {}
+        for original in self._counts:
+            self._update_resolved(original)
+
+    def __len__(self):
+        return len(self._resolved)
+
+    def _update_resolved(self, original):
+        counts = self._counts[original]
+        self._resolved[original] = max(sorted(counts), key=counts.get)
+
+    def resolve(self, original):
+        """返回原始名称对应的官方名称，没有记录时返回 None"""
+        return self._resolved.get(original)
+
+    def learn(self, originals, canonicals, results):
+        """
+        从一次处理结果中学习别名：学校匹配结果为"匹配"且原始名称与院校名称不同的行。
+        返回新增的别名条数。
+        """
+        added = 0
+        with self._lock:
+            for original, canonical, result in zip(originals, canonicals, results):
+                if result != '匹配':
+                    continue
+                original = str(original).strip() if original is not None else ''
+                canonical = str(canonical).strip()
+                if not original or original == canonical or original.lower() == 'nan':
+                    continue
+                counts = self._counts.setdefault(original, {})
+                if not counts:
+                    added += 1
+                counts[canonical] = counts.get(canonical, 0) + 1
+                self._update_resolved(original)
+        return added
+
+    def save(self):
+        """先写临时文件再替换；写入失败只记录日志"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with self._lock:
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._counts, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                self.mtime = _file_mtime(self.path)
+            except Exception as e:
+                logging.warning(f"写入学校别名文件 {self.path} 失败：{e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+
+_alias_index = None
+_alias_lock = threading.Lock()
+
+
+def get_school_alias_index():
+    """进程内共享的别名索引（首次使用或文件被其他进程更新后从磁盘加载）"""
+    global _alias_index
+    path = resource_path(ALIAS_FILE)
+    index = _alias_index
+    if index is None or index.mtime != _file_mtime(path):
+        with _alias_lock:
+            if _alias_index is None or _alias_index.mtime != _file_mtime(path):
+                _alias_index = SchoolAliasIndex(path)
+            index = _alias_index
+    return index
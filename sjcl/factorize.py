@@ -0,0 +1,64 @@
+"""
+按不同取值执行的转换：科类、报考要求、层次、专业组选科要求等列在一个文件中只有几十到几百种取值，
+map_unique 对每个不同的输入只调用一次转换函数，再按编码广播回每一行，
+代替逐行 apply（尤其是 apply(lambda x: pd.Series(...)) 每行创建一个 Series 的写法）。
+
+转换函数必须是纯函数（结果只取决于参数）。
+"""
+import numpy as np
+import pandas as pd
+
+
+def _factorize(column):
+    """
+    返回 (每行编码, 不同取值列表)。
+    非 object 类型的列（字符串、数值）用 pd.factorize；object 列和普通序列按 (类型, 值) 区分，
+    避免 1、1.0、True 或 None、NaN 被当作同一个取值而得到别的取值的转换结果。
+    """
+    if isinstance(column, pd.Series) and column.dtype != object:
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        return codes, list(pd.Series(uniques).astype(object))
+    index = {}
+    uniques = []
+    codes = np.empty(len(column), dtype=np.intp)
+    for i, value in enumerate(column):
+        key = (type(value), value)
+        code = index.get(key)
+        if code is None:
+            # NaN 与自身不相等，每个 NaN 对象都会单独成为一个取值（结果仍正确，只是多调用几次）
+            code = index[key] = len(uniques)
+            uniques.append(value)
+        codes[i] = code
+    return codes, uniques
+
+
+def map_unique(func, *columns, n_outputs=None):
+    """
+    对等长的若干列（Series 或序列）逐行计算 func(*每列的值)，每种不同的参数组合只调用一次。
+    返回与行数等长的 object 数组；n_outputs 不为空时 func 返回元组，按位置拆成 n_outputs 个数组返回。
+    """
+    if not columns:
+        raise Exception("map_unique 至少需要一列参数")
+    factorized = [_factorize(column) for column in columns]
+    if len(factorized) == 1:
+        codes, uniques = factorized[0]
+        args = [(value,) for value in uniques]
+    else:
+        # 多列时把各列编码组合成一个键，再对组合键编码
+        combined = np.zeros(len(factorized[0][0]), dtype=np.int64)
+        for col_codes, col_uniques in factorized:
+            combined = combined * len(col_uniques) + col_codes
+        _, first_rows, codes = np.unique(combined, return_index=True, return_inverse=True)
+        args = [tuple(col_uniques[col_codes[row]] for col_codes, col_uniques in factorized) for row in first_rows]
+    results = [func(*arg) for arg in args]
+    if n_outputs is None:
+        return _broadcast(results, codes)
+    return tuple(_broadcast([result[i] for result in results], codes) for i in range(n_outputs))
+
+
+def _broadcast(values, codes):
+    """按编码把每个不同取值的结果展开到每一行（逐个赋值，避免 numpy 把元组结果展开成二维数组）"""
+    array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        array[i] = value
+    return array[codes]
@@ -0,0 +1,207 @@
+"""
+专业组代码匹配：按"学校-省份-层次-科类-批次-专业"从招生计划中匹配专业组代码，并导出结果。
+"""
+import pandas as pd
+
+
+# ============================
+# 专业组代码匹配导出函数
+# ============================
+def export_match_result_to_excel(export_df, headers, year_value, output_path):
+    """导出专业组代码匹配结果为Excel格式"""
+    import openpyxl
+    from openpyxl.styles import Alignment, numbers
+
+    # 创建备注文本
+    remark_text = """备注：请删除示例后再填写；
+1.省份：必须填写各省份简称，例如：北京、内蒙古，不能带有市、省、自治区、空格、特殊字符等2.科类：浙江、上海限定"综合、艺术类、体育类"，内蒙古限定"文科、理科、蒙授文科、蒙授理科、艺术类、艺术文、艺术理、体育类、体育文、
+体育理、蒙授艺术、蒙授体育"，其他省份限定"文科、理科、艺术类、艺术文、艺术理、体育类、体育文、体育理"
+3.批次：（以下为19年使用批次）
+河北、内蒙古、吉林、江苏、安徽、福建、江西、河南、湖北、广西、重庆、四川、贵州、云南、西藏、陕西、甘肃、宁夏、新疆限定本科提前批、
+本科一批、本科二批、专科提前批、专科批、国家专项计划本科批、地方专项计划本科批；
+黑龙江、湖南、青海限定本科提前批、本科一批、本科二批、本科三批、专科提前批、专科批、国家专项计划本科批、地方专项计划本科批；
+山西限定本科一批A段、本科一批B段、本科二批A段、本科二批B段、本科二批C段、专科批、国家专项计划本科批、地方专项计划本科批；
+浙江限定普通类提前批、平行录取一段、平行录取二段、平行录取三段
+4.招生人数：仅能填写数字
+5.最高分、最低分、平均分：仅能填写数字，保留小数后两位，且三者顺序不能改变，最低分为必填项，其中艺术类和体育类分数为文化课分数
+6.一级层次：限定"本科、专科（高职）"，该部分为招生专业对应的专业层次
+7.最低分位次：仅能填写数字;
+8.数据来源：必须限定——官方考试院、大红本数据、学校官网、销售、抓取、圣达信、优志愿、学业桥
+9.选科要求：不限科目专业组;多门选考;单科、多科均需选考
+10.选科科目必须是科目的简写（物、化、生、历、地、政、技）
+                    
+11.2020北京、海南，17-19上海仅限制本科专业组代码必填
+12.新八省首选科目必须选择（物理或历史）
+13.分数区间仅限北京"""
+
+    # 创建工作簿
+    wb = openpyxl.Workbook()
+    ws = wb.active
+
+    # 第一行：合并A1-U1并写入备注
+    ws.merge_cells('A1:U1')
+    ws['A1'] = remark_text
+    ws['A1'].alignment = Alignment(wrap_text=True, vertical='top')
+    # 设置第一行行高为220磅
+    ws.row_dimensions[1].height = 220
+
+    # 第二行：A2="招生年份"，B2=年份值
+    ws['A2'] = '招生年份'
+    ws['B2'] = year_value if year_value else ''
+    # B2设置为文本格式
+    ws['B2'].number_format = numbers.FORMAT_TEXT
+
+    # 处理标题行：如果headers为空或None，使用export_df的列名
+    if not headers or len(headers) == 0:
+        headers = list(export_df.columns)
+    
+    # 清理headers中的None值，并去除空字符串
+    headers = [h if h is not None else '' for h in headers]
+    
+    # 按照headers的顺序导出，确保与原始文件A的第3行标题顺序一致
+    # 如果headers中的列在export_df中存在，使用export_df的值；否则为空
+    final_headers = []
+    for h in headers:
+        if h and h.strip():  # 非空标题
+            final_headers.append(h.strip())
+    
+    # 添加export_df中存在但headers中没有的列（追加到末尾）
+    for col in export_df.columns:
+        if col not in final_headers:
+            final_headers.append(col)
+
+    # 第三行：标题行（使用处理后的标题）
+    for col_idx, header in enumerate(final_headers, start=1):
+        ws.cell(row=3, column=col_idx, value=header if header else '')
+
+    # 数据行（从第4行开始）
+    for row_idx, (_, row_data) in enumerate(export_df.iterrows(), start=4):
+        for col_idx, header in enumerate(final_headers, start=1):
+            if header in export_df.columns:
+                value = row_data[header]
+                # 处理空值
+                if value is None or pd.isna(value):
+                    value = ''
+                elif isinstance(value, str) and value.lower() in ['nan', 'none']:
+                    value = ''
+                cell = ws.cell(row=row_idx, column=col_idx, value=value)
+                # 设置代码列为文本格式
+                if header in ['专业组代码', '专业代码', '招生代码']:
+                    cell.number_format = numbers.FORMAT_TEXT
+            else:
+                ws.cell(row=row_idx, column=col_idx, value='')
+
+    wb.save(output_path)
+
+
+# ============================
+# 专业组代码匹配
+# ============================
+
+tableA_fields = [
+    "学校名称", "省份", "招生专业", "专业备注（选填）",
+    "一级层次", "招生科类", "招生批次", "招生类型（选填）"
+]
+
+rename_mapping_B = {
+    "学校": "学校名称",
+    "省份": "省份",
+    "层次": "一级层次",
+    "科类": "招生科类",
+    "批次": "招生批次",
+    "招生类型": "招生类型（选填）",
+    "专业": "招生专业",
+    "备注": "专业备注（选填）"
+}
+
+
+def process_data(dfA, dfB):
+    dfB.rename(columns=rename_mapping_B, inplace=True)
+
+    # 构建组合键（不含备注和招生类型）：学校-省份-层次-科类-批次-专业
+    key_fields = [f for f in tableA_fields if f not in ["专业备注（选填）", "招生类型（选填）"]]
+    dfA["组合键"] = dfA[key_fields].fillna("").astype(str).apply(
+        lambda x: "|".join([str(i).strip() for i in x]), axis=1)
+    dfB["组合键"] = dfB[key_fields].fillna("").astype(str).apply(
+        lambda x: "|".join([str(i).strip() for i in x]), axis=1)
+
+    # 检查A表和B表中组合键的重复性
+    # 统计A表中每个组合键出现的次数
+    a_key_counts = dfA["组合键"].value_counts()
+    # 统计B表中每个组合键出现的次数
+    b_key_counts = dfB["组合键"].value_counts()
+
+    # 找出A表中有重复的组合键（出现次数>1）
+    a_duplicate_keys = set(a_key_counts[a_key_counts > 1].index)
+    # 找出B表中有重复的组合键（出现次数>1）
+    b_duplicate_keys = set(b_key_counts[b_key_counts > 1].index)
+
+    # 构建B表字典：组合键 → 记录列表
+    b_dict = dfB.groupby("组合键").apply(lambda x: x.to_dict("records")).to_dict()
+
+    # 存储需要手动补充的记录信息
+    manual_fill_records = []
+
+    def get_code(row):
+        key = row["组合键"]
+        candidates = b_dict.get(key, [])
+
+        # 检查该组合键在A表或B表中是否有重复
+        has_duplicate_in_a = key in a_duplicate_keys
+        has_duplicate_in_b = key in b_duplicate_keys
+
+        # 如果A表或B表中任何一个有重复，需要手动补充
+        if has_duplicate_in_a or has_duplicate_in_b:
+            # 返回完整的候选记录列表（包含所有字段信息）
+            return None, candidates if candidates else []
+
+        # A表和B表中都没有重复，且B表中只有唯一候选记录，可以直接匹配
+        if len(candidates) == 1:
+            return candidates[0]["专业组代码"], None
+
+        # 其他情况（无候选记录或多个候选记录）都需要手动补充
+        # 返回None和候选记录列表（可能为空）
+        return None, candidates if candidates else []
+
+    # 应用匹配逻辑
+    results = dfA.apply(get_code, axis=1)
+    dfA["专业组代码"] = results.apply(lambda x: x[0] if x[0] is not None else "")
+    
+    # 收集需要手动补充的记录（包含完整的候选记录信息）
+    # 只要专业组代码没匹配到的，都需要手动选择
+    for idx, row in dfA.iterrows():
+        result = results.iloc[idx]
+        matched_code = result[0]  # 匹配到的专业组代码
+        candidates = result[1] if result[1] is not None else []
+        
+        # 如果专业组代码为空（没有匹配到），需要手动补充
+        if not matched_code or matched_code == "":
+            # 提取候选记录的详细信息
+            candidate_records = []
+            for candidate in candidates:
+                candidate_records.append({
+                    "专业组代码": candidate.get("专业组代码", ""),
+                    "学校名称": candidate.get("学校名称", ""),
+                    "省份": candidate.get("省份", ""),
+                    "招生专业": candidate.get("招生专业", ""),
+                    "一级层次": candidate.get("一级层次", ""),
+                    "招生科类": candidate.get("招生科类", ""),
+                    "招生批次": candidate.get("招生批次", ""),
+                    "招生类型（选填）": candidate.get("招生类型（选填）", ""),
+                    "备注（招生计划）": candidate.get("专业备注（选填）", ""),  # B表重命名后的备注字段
+                })
+            
+            manual_fill_records.append({
+                "索引": idx,
+                "学校名称": row.get("学校名称", ""),
+                "省份": row.get("省份", ""),
+                "招生专业": row.get("招生专业", ""),
+                "一级层次": row.get("一级层次", ""),
+                "招生科类": row.get("招生科类", ""),
+                "招生批次": row.get("招生批次", ""),
+                "招生类型（选填）": row.get("招生类型（选填）", ""),
+                "专业备注（选填）": row.get("专业备注（选填）", ""),  # A表的专业备注字段
+                "候选记录": candidate_records  # 完整的候选记录列表（可能为空）
+            })
+
+    return dfA, manual_fill_records
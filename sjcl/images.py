@@ -0,0 +1,71 @@
+"""
+就业质量报告图片提取（requests / bs4 / PIL 仅在调用时导入）。
+"""
+import io
+import os
+from urllib.parse import urljoin, urlparse
+
+
+# ========== 就业质量报告图片提取 ==========
+
+def fetch_images_static(url, output_folder):
+    import requests
+    from bs4 import BeautifulSoup
+    from PIL import Image
+
+    os.makedirs(output_folder, exist_ok=True)
+    image_paths = []
+    try:
+        resp = requests.get(url, timeout=10)
+        resp.raise_for_status()
+        soup = BeautifulSoup(resp.text, "html.parser")
+        imgs = soup.find_all("img")
+        for idx, img in enumerate(imgs, 1):
+            src = img.get("src")
+            if not src:
+                continue
+            full_url = urljoin(url, src)
+            # 跳过 base64 或 blob 类型
+            if full_url.startswith("data:") or full_url.startswith("blob:"):
+                continue
+            ext = os.path.splitext(urlparse(full_url).path)[1] or ".jpg"
+            filename = f"img_{idx:03d}{ext}"
+            path = os.path.join(output_folder, filename)
+            try:
+                img_resp = requests.get(full_url, timeout=10)
+                if img_resp.status_code != 200:
+                    continue
+                content_type = img_resp.headers.get("content-type", "")
+                # 仅保存真正的图片类型
+                if not content_type.startswith("image/"):
+                    continue
+                img_data = img_resp.content
+                # 验证图片是否可识别
+                try:
+                    Image.open(io.BytesIO(img_data))
+                except Exception:
+                    continue
+                with open(path, "wb") as f:
+                    f.write(img_data)
+                image_paths.append(path)
+            except Exception:
+                continue
+    except Exception as e:
+        raise Exception(f"静态模式加载失败: {e}")
+    return image_paths
+
+
+def images_to_pdf(image_paths, pdf_path):
+    from PIL import Image
+
+    images = []
+    for path in sorted(image_paths):
+        try:
+            img = Image.open(path).convert("RGB")
+            images.append(img)
+        except Exception:
+            continue
+    if images:
+        images[0].save(pdf_path, save_all=True, append_images=images[1:])
+        return True
+    return False
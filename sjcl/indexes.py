@@ -0,0 +1,229 @@
+"""
+参考数据的查找索引（每个 ReferenceData 版本构建一次，随版本一起切换）。
+
+BigramIndex：字符二元组倒排索引，为不匹配的学校名称给出最相近的官方名称。
+只统计与查询共享二元组的候选，避免对全部 2,900+ 学校逐一计算相似度。
+
+MajorIndex：把 招生专业.xlsx 中"专业名称+层次"拼接的字符串拆成 专业名称 → 层次集合，
+据此区分"层次不符"和"专业名称不存在"；专业名称上建 BK 树，按编辑距离给出最相近的有效专业；
+另建前缀树（括号统一后的专业名称），为"软件工程（中外合作办学）"这类带后缀的专业找到最长的有效专业名称。
+"""
+import re
+import heapq
+from collections import Counter
+
+
+def _bigrams(text):
+    """带首尾标记的字符二元组集合（短名称也能得到足够的二元组）"""
+    padded = f'^{text}$'
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class BigramIndex:
+    """字符二元组倒排索引，按 Dice 系数 2|A∩B|/(|A|+|B|) 排序返回最相近的名称"""
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        self._sizes = []
+        self._postings = {}
+        for idx, name in enumerate(self.names):
+            grams = _bigrams(name)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+
+    def suggest(self, query, k=3, min_score=0.5):
+        """返回最多 k 个 (名称, 相似度)，相似度低于 min_score 的不返回"""
+        query = str(query).strip()
+        if not query:
+            return []
+        grams = _bigrams(query)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+        size = len(grams)
+        scored = []
+        for idx, shared in counts.items():
+            score = 2 * shared / (size + self._sizes[idx])
+            if score >= min_score:
+                scored.append((score, idx))
+        top = heapq.nsmallest(k, scored, key=lambda s: (-s[0], self.names[s[1]]))
+        return [(self.names[idx], score) for score, idx in top]
+
+
+# 招生专业.xlsx 中专业名称后拼接的层次，如 本科(普通)、本科(职业)、专科(高职)
+LEVEL_SUFFIX_PATTERN = re.compile(r'^(.+?)((?:本科|专科)[(（][^()（）]+[)）])$')
+
+
+def split_major_combo(combo):
+    """把"计算艺术与设计本科(普通)"拆成 ("计算艺术与设计", "本科(普通)")，无层次后缀时层次为空"""
+    m = LEVEL_SUFFIX_PATTERN.match(combo)
+    if m:
+        return m.group(1), m.group(2)
+    return combo, ''
+
+
+# 专业名称中的各种括号统一为中文括号（str.translate 用）
+MAJOR_BRACKET_TABLE = str.maketrans('([{【<《)]}】>》', '（（（（（（））））））')
+
+
+def normalize_major_brackets(name):
+    return str(name).translate(MAJOR_BRACKET_TABLE)
+
+
+class PrefixTrie:
+    """字符前缀树：prefixes 返回 text 的所有前缀中在树中的词，最长的在前"""
+
+    _END = None
+
+    def __init__(self, words=()):
+        self._root = {}
+        for key, value in words:
+            self.add(key, value)
+
+    def add(self, key, value):
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[self._END] = value
+
+    def prefixes(self, text):
+        """返回 [(前缀长度, 值)]，按前缀长度从长到短"""
+        found = []
+        node = self._root
+        for i, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            if self._END in node:
+                found.append((i + 1, node[self._END]))
+        found.reverse()
+        return found
+
+
+def _char_masks(pattern):
+    """位并行编辑距离用的字符位掩码：字符 → 该字符在 pattern 中出现位置的位集合"""
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _bit_parallel_distance(masks, m, text):
+    """Myers/Hyyrö 位并行算法计算 pattern（m 个字符，已转为 masks）与 text 的编辑距离"""
+    if m == 0:
+        return len(text)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & full) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def levenshtein(a, b):
+    """编辑距离（插入、删除、替换各计 1）"""
+    return _bit_parallel_distance(_char_masks(a), len(a), b)
+
+
+class BKTree:
+    """按编辑距离组织的 BK 树，search 只访问满足三角不等式的子树"""
+
+    def __init__(self, words):
+        self._root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, query, max_distance):
+        """返回与 query 编辑距离不超过 max_distance 的 (距离, 词)，按距离、词排序"""
+        if self._root is None:
+            return []
+        masks = _char_masks(query)
+        m = len(query)
+        results = []
+        stack = [self._root]
+        while stack:
+            word, children = stack.pop()
+            distance = _bit_parallel_distance(masks, m, word)
+            if distance <= max_distance:
+                results.append((distance, word))
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        results.sort()
+        return results
+
+
+class MajorIndex:
+    """专业名称 → 层次集合，以及专业名称上的 BK 树和前缀树"""
+
+    def __init__(self, combos):
+        levels = {}
+        for combo in combos:
+            name, level = split_major_combo(combo)
+            levels.setdefault(name, set()).add(level)
+        self.levels_by_name = {name: frozenset(values) for name, values in levels.items()}
+        self._tree = BKTree(sorted(self.levels_by_name))
+        self._trie = PrefixTrie((normalize_major_brackets(name), name) for name in sorted(self.levels_by_name))
+
+    @staticmethod
+    def _max_distance(name):
+        """允许的编辑距离随名称长度放宽：4 字以内 1，8 字以内 2，更长 3"""
+        return min(3, max(1, (len(name) + 3) // 4))
+
+    def diagnose(self, major, level, k=3):
+        """
+        判断不匹配原因并给出建议（建议均为 招生专业.xlsx 中的有效"专业名称+层次"）：
+        返回 (原因, [建议])，原因为 '专业名称为空'、'层次不符' 或 '专业名称不存在'。
+        """
+        if not major:
+            return '专业名称为空', []
+        levels = self.levels_by_name.get(major)
+        if levels is not None:
+            return '层次不符', [f"{major}{lv}" for lv in sorted(levels)][:k]
+        suggestions = []
+        for _, name in self._tree.search(major, self._max_distance(major)):
+            name_levels = self.levels_by_name[name]
+            best_level = level if level in name_levels else sorted(name_levels)[0]
+            suggestions.append(f"{name}{best_level}")
+            if len(suggestions) >= k:
+                break
+        return '专业名称不存在', suggestions
+
+    def match_prefix(self, major, level, suffix_pattern):
+        """
+        括号统一后，取 major 的最长有效专业名称前缀：剩余部分须整体匹配 suffix_pattern（如括号内的办学形式、校区），
+        且该专业有此层次。返回 招生专业.xlsx 中的专业名称，找不到时返回 ''。
+        """
+        text = normalize_major_brackets(major)
+        for length, name in self._trie.prefixes(text):
+            if level in self.levels_by_name[name] and suffix_pattern.fullmatch(text[length:]):
+                return name
+        return ''
@@ -0,0 +1,150 @@
+"""
+学业桥数据处理的进程池执行方式。
+
+analyze_and_fix 的正则和 pandas apply 都持有 GIL，线程池在多核服务器上没有加速效果，
+因此提供常驻的进程池：模块在进程内只初始化一次，池在 Streamlit 重跑之间保留（已启动的工作进程保持预热）。
+参考数据在每个工作进程启动时通过 initializer 传入一次，之后每个数据块只传输按列打包的数据，工作进程只传回新增的列；
+参考数据版本变化时关闭旧池、按新版本重建。
+"""
+import os
+import sys
+import time
+import types
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# 设置工作进程数的环境变量，未设置时为 CPU 核数。每个工作进程各自导入 pandas、加载 jieba 词典并构建全部索引，
+# 常驻内存约 220 MB（随参考数据规模增长），另加正在处理的数据块；内存有限的服务器上应按可用内存设置较小的值
+PROCESS_POOL_WORKERS_ENV = 'SJCL_PROCESS_WORKERS'
+
+# 工作进程中的参考数据（由 _init_worker 设置）
+_worker_reference = None
+
+# 主进程中常驻的进程池及其参考数据版本、工作进程数
+_pool = None
+_pool_version = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+# 启动工作进程时替换 __main__ 用的锁（sys.modules 为进程内共享）
+_spawn_lock = threading.Lock()
+
+
+def pack_frame(df):
+    """把 DataFrame 按列打包为 (索引, [(列名, dtype, 值数组)])，比直接 pickle DataFrame 更紧凑"""
+    return df.index.to_numpy(), [(col, str(df[col].dtype), df[col].to_numpy()) for col in df.columns]
+
+
+def unpack_frame(packed):
+    index, columns = packed
+    return pd.DataFrame({col: pd.Series(values, index=index, dtype=dtype) for col, dtype, values in columns},
+                        index=index)
+
+
+def _init_worker(school_names, major_combos, version):
+    """工作进程初始化：保存参考数据，预先构建查找索引，后台加载 jieba 词典"""
+    global _worker_reference
+    from .reference_data import ReferenceData
+    from .word_typos import start_jieba_preload
+
+    _worker_reference = ReferenceData(school_names, major_combos, version=version)
+    start_jieba_preload(_worker_reference)
+    _worker_reference.warm_indexes()
+
+
+def _process_packed_chunk(packed):
+    from .xueyeqiao import process_chunk_columns
+
+    # 工作进程只使用一个参考数据版本，词级错别字检测器在进程内构建一次，之后每块直接取用
+    start = time.perf_counter()
+    counts = {}
+    columns = process_chunk_columns(unpack_frame(packed), _worker_reference, counts=counts)
+    return columns, time.perf_counter() - start, counts
+
+
+def process_pool_workers():
+    """进程池的工作进程数：环境变量 SJCL_PROCESS_WORKERS 设置的值（正整数），未设置或无效时为 CPU 核数"""
+    value = os.environ.get(PROCESS_POOL_WORKERS_ENV, '').strip()
+    if value:
+        if value.isdigit() and int(value) > 0:
+            return int(value)
+        logging.warning(f"{PROCESS_POOL_WORKERS_ENV}={value!r} 不是正整数，按 CPU 核数启动工作进程")
+    return os.cpu_count() or 1
+
+
+def process_pool_supported():
+    """PyInstaller 打包的程序（sys.frozen）用 spawn 启动工作进程会重新运行整个程序，不能使用进程池"""
+    return not getattr(sys, 'frozen', False)
+
+
+def get_process_pool(reference, max_workers=None):
+    """
+    取与 reference 版本对应的常驻进程池，工作进程数为 max_workers（未传入时见 process_pool_workers）；
+    版本或进程数变化时关闭旧池（已提交的任务继续完成）并新建。
+    使用 spawn 方式启动工作进程，避免 fork 时复制 Streamlit 和监控线程持有的锁。
+    """
+    global _pool, _pool_version, _pool_workers
+    workers = max_workers or process_pool_workers()
+    with _pool_lock:
+        if _pool is not None and _pool_version == reference.version and _pool_workers == workers:
+            return _pool
+        if _pool is not None:
+            logging.info(f"参考数据版本或进程数变化（{_pool_version}，{_pool_workers} 个进程 → "
+                         f"{reference.version}，{workers} 个进程），重建进程池")
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(reference.school_names, reference.major_combos, reference.version),
+        )
+        _pool_version = reference.version
+        _pool_workers = workers
+        logging.info(f"已创建进程池（{workers} 个进程，参考数据版本 {reference.version}）")
+        return _pool
+
+
+@contextmanager
+def _plain_main():
+    """
+    启动工作进程期间把 __main__ 换成空模块。streamlit run 时 __main__ 是 Streamlit 按 wangye.py 生成的模块，
+    spawn 方式启动的工作进程会按它的 __file__ 把整个页面脚本作为 __mp_main__ 重新运行一遍
+    （启动参考数据监控线程、再次加载参考数据和 jieba、运行页面代码）；空模块没有 __file__ 和 __spec__，
+    工作进程只导入处理数据块需要的 sjcl 模块。
+    """
+    with _spawn_lock:
+        main = sys.modules.get('__main__')
+        plain = types.ModuleType('__main__')
+        sys.modules['__main__'] = plain
+        try:
+            yield
+        finally:
+            # 期间其他会话重跑时 Streamlit 会重新设置 __main__，这时保留它设置的模块
+            if sys.modules.get('__main__') is plain:
+                sys.modules['__main__'] = main
+
+
+def submit_chunk(pool, chunk):
+    """
+    提交一个数据块，返回的 future 结果为 (新增的列 {列名: 数组}, 处理耗时秒数, 备注计数)，只传回新增的列。
+    进程池在提交任务时按需启动工作进程，因此提交时替换 __main__（见 _plain_main）。
+    """
+    packed = pack_frame(chunk)
+    with _plain_main():
+        return pool.submit(_process_packed_chunk, packed)
+
+
+def shutdown_process_pool():
+    """关闭常驻进程池（下次使用时重建）"""
+    global _pool, _pool_version, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_version = None
+        _pool_workers = None
@@ -0,0 +1,399 @@
+"""
+参考数据加载（school_data.xlsx 有效学校名称、招生专业.xlsx 有效专业+层次组合）。
+
+Streamlit 每次点击控件都会重新执行 wangye.py，但已导入的模块在进程内只初始化一次，
+因此缓存放在本模块中，所有会话、所有重跑共享同一份数据。
+缓存按 (文件路径, 修改时间) 判断是否有效，文件被替换后下一次获取时自动重新加载。
+
+解析 xlsx 是启动时最慢的一步，因此首次解析后会把结果编译为二进制快照 reference_data.pkl
+（frozenset + 源文件 sha256）。之后优先读取快照，源文件内容变化（哈希不一致）时自动回退到
+xlsx 并重建快照。打包或部署前可执行 `python -m sjcl.reference_data` 预先生成快照。
+
+数据组推送新的参考文件后，start_reference_watcher() 启动的后台线程会发现文件变化，
+在请求路径之外重新构建 ReferenceData 及其索引，再整体替换当前版本（单次引用赋值，原子切换），
+之后预先构建新版本的词级错别字检测器。
+正在运行的处理任务在开始时取得一个 ReferenceData，整个任务都使用这一版本；新任务取到新版本。
+
+每个发布过的版本另存一份到 reference_history/<版本号>.pkl，导出结果记录了校验时的版本号，
+参考数据更新后可按两个版本的集合差只重新校验受影响的行（见 sjcl.xueyeqiao.revalidate_remarks_file）。
+"""
+import os
+import sys
+import time
+import pickle
+import hashlib
+import logging
+import threading
+
+SCHOOL_DATA_FILE = "school_data.xlsx"
+SCHOOL_DATA_COLUMN = "学校名称"
+MAJOR_DATA_FILE = "招生专业.xlsx"
+MAJOR_DATA_COLUMN = "招生专业"
+SNAPSHOT_FILE = "reference_data.pkl"
+SNAPSHOT_FORMAT = 1
+WATCH_INTERVAL_SECONDS = 5
+HISTORY_DIR = "reference_history"
+
+
+# ======== 路径兼容函数 =========
+def resource_path(relative_path):
+    """兼容 PyCharm 开发环境 和 PyInstaller 打包后的路径"""
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, relative_path)
+    return os.path.join(os.path.abspath("."), relative_path)
+
+
+class ReferenceData:
+    """一次加载得到的参考数据（只读），校验函数通过它访问有效学校名称和专业组合"""
+
+    def __init__(self, school_names, major_combos, errors=None, version='', mtimes=None):
+        self.school_names = school_names
+        self.major_combos = major_combos
+        # 加载失败的数据集：{'school': 错误信息, 'major': 错误信息}
+        self.errors = errors or {}
+        # 版本号由两个源文件的内容哈希得到，内容不变则版本不变
+        self.version = version
+        # 加载时各源文件的修改时间：{文件路径: mtime}
+        self.mtimes = mtimes or {}
+        self.loaded_at = time.time()
+        self._index_lock = threading.Lock()
+        self._indexes = {}
+
+    def _get_index(self, name, build):
+        """查找索引首次使用时构建，同一版本内复用"""
+        index = self._indexes.get(name)
+        if index is None:
+            with self._index_lock:
+                index = self._indexes.get(name)
+                if index is None:
+                    index = self._indexes[name] = build()
+        return index
+
+    @property
+    def school_index(self):
+        """学校名称二元组索引"""
+        from .indexes import BigramIndex
+
+        return self._get_index('school', lambda: BigramIndex(self.school_names))
+
+    @property
+    def major_index(self):
+        """专业名称 → 层次集合及专业名称 BK 树"""
+        from .indexes import MajorIndex
+
+        return self._get_index('major', lambda: MajorIndex(self.major_combos))
+
+    def warm_indexes(self):
+        """预先构建全部查找索引（在后台线程中调用，避免首次校验时等待）"""
+        self.school_index
+        self.major_index
+
+
+# 缓存：(文件路径, 列名) -> (修改时间, frozenset, sha256)
+_cache = {}
+_cache_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'load_seconds': 0.0, 'reloads': 0, 'files': {}}
+
+# 当前发布的参考数据版本，只通过 _publish 整体替换
+_current = None
+_publish_lock = threading.Lock()
+_watcher = None
+
+
+def _read_column_set(path, column):
+    """读取 Excel 指定列，去空、去首尾空格后返回 frozenset"""
+    import pandas as pd
+
+    df = pd.read_excel(path, usecols=[column])
+    return frozenset(df[column].dropna().astype(str).str.strip())
+
+
+def _file_sha256(path):
+    """计算文件内容哈希，用于判断快照是否过期"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_snapshot():
+    """读取快照文件，不存在或格式不符时返回空快照"""
+    path = resource_path(SNAPSHOT_FILE)
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return {'format': SNAPSHOT_FORMAT, 'entries': {}}
+    except Exception as e:
+        logging.warning(f"读取参考数据快照 {path} 失败，将重新解析 Excel：{e}")
+        return {'format': SNAPSHOT_FORMAT, 'entries': {}}
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+        return {'format': SNAPSHOT_FORMAT, 'entries': {}}
+    return snapshot
+
+
+def _write_snapshot(snapshot):
+    """先写临时文件再替换，避免其他进程读到半个快照；写入失败（如只读目录）只记录日志"""
+    path = resource_path(SNAPSHOT_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logging.warning(f"写入参考数据快照 {path} 失败：{e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _load_from_snapshot_or_excel(relative_path, path, column):
+    """
+    优先从快照取数据；快照缺失或源文件哈希变化时解析 Excel 并更新快照。
+    返回 (frozenset, 来源)，来源为 'snapshot' 或 'xlsx'。
+    """
+    sha256 = _file_sha256(path)
+    snapshot = _read_snapshot()
+    entry = snapshot['entries'].get(relative_path)
+    if entry is not None and entry['sha256'] == sha256 and entry['column'] == column:
+        return entry['values'], sha256, 'snapshot'
+
+    values = _read_column_set(path, column)
+    snapshot['entries'][relative_path] = {'column': column, 'sha256': sha256, 'values': values}
+    _write_snapshot(snapshot)
+    return values, sha256, 'xlsx'
+
+
+def _load_entry(relative_path, column):
+    """按 (路径, 修改时间) 命中缓存，否则从快照或 Excel 加载；返回 (路径, 修改时间, frozenset, sha256)"""
+    path = resource_path(relative_path)
+    mtime = os.path.getmtime(path)
+    key = (path, column)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == mtime:
+            _stats['hits'] += 1
+            return path, mtime, entry[1], entry[2]
+
+        start = time.perf_counter()
+        values, sha256, source = _load_from_snapshot_or_excel(relative_path, path, column)
+        elapsed = time.perf_counter() - start
+
+        _cache[key] = (mtime, values, sha256)
+        _stats['misses'] += 1
+        _stats['load_seconds'] += elapsed
+        _stats['files'][path] = {'mtime': mtime, 'count': len(values), 'load_seconds': elapsed, 'source': source}
+        logging.info(f"加载参考数据 {relative_path}（{source}）：{len(values)} 条，耗时 {elapsed:.3f} 秒")
+        return path, mtime, values, sha256
+
+
+def load_reference_set(relative_path, column):
+    """
+    加载参考数据列为 frozenset，同一进程内按 (路径, 修改时间) 缓存。
+    文件不存在或读取失败时抛出异常，由调用方决定如何降级。
+    """
+    return _load_entry(relative_path, column)[2]
+
+
+def _build_reference_data():
+    """
+    从缓存/快照/Excel 构建一份完整的 ReferenceData。任一文件加载失败时对应集合为空，
+    错误信息记录在 errors 中，学校名称/专业匹配结果会全部为"不匹配"，由页面给出提示。
+    """
+    errors = {}
+    mtimes = {}
+    hashes = []
+    sets = {}
+    for key, relative_path, column in (('school', SCHOOL_DATA_FILE, SCHOOL_DATA_COLUMN),
+                                       ('major', MAJOR_DATA_FILE, MAJOR_DATA_COLUMN)):
+        try:
+            path, mtime, values, sha256 = _load_entry(relative_path, column)
+            mtimes[path] = mtime
+            hashes.append(sha256)
+            sets[key] = values
+        except Exception as e:
+            logging.error(f"读取 {relative_path} 出错：{e}")
+            mtimes[resource_path(relative_path)] = None
+            hashes.append('')
+            sets[key] = frozenset()
+            errors[key] = str(e)
+    version = hashlib.sha256('|'.join(hashes).encode('utf-8')).hexdigest()[:12]
+    return ReferenceData(sets['school'], sets['major'], errors, version, mtimes)
+
+
+def _history_path(version):
+    return os.path.join(resource_path(HISTORY_DIR), f"{version}.pkl")
+
+
+def archive_reference_version(data):
+    """把加载成功的版本存入 reference_history（同一版本只写一次）；写入失败只记录日志"""
+    if data.errors or not data.version:
+        return
+    path = _history_path(data.version)
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'school': data.school_names, 'major': data.major_combos}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logging.warning(f"保存参考数据版本 {data.version} 失败：{e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_reference_version(version):
+    """按版本号取参考数据：当前版本直接返回，其余从 reference_history 读取，找不到时返回 None"""
+    current = _current
+    if current is not None and current.version == version:
+        return current
+    try:
+        with open(_history_path(version), 'rb') as f:
+            sets = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    return ReferenceData(sets['school'], sets['major'], version=version)
+
+
+def diff_reference_versions(old, new):
+    """两个版本之间新增、删除的学校名称和专业组合（集合差）"""
+    return {
+        'school_added': new.school_names - old.school_names,
+        'school_removed': old.school_names - new.school_names,
+        'major_added': new.major_combos - old.major_combos,
+        'major_removed': old.major_combos - new.major_combos,
+    }
+
+
+def _publish(data):
+    """整体替换当前版本；版本号未变时保留原对象，避免无意义的切换"""
+    global _current
+    with _publish_lock:
+        if _current is not None and _current.version == data.version and _current.errors == data.errors:
+            _current.mtimes = data.mtimes
+            return _current
+        if _current is not None:
+            _stats['reloads'] += 1
+            logging.info(f"参考数据已切换：{_current.version} → {data.version}")
+        _current = data
+    archive_reference_version(data)
+    return data
+
+
+def _source_mtimes():
+    """各参考数据源文件当前的修改时间，文件不存在时为 None"""
+    mtimes = {}
+    for relative_path in (SCHOOL_DATA_FILE, MAJOR_DATA_FILE):
+        path = resource_path(relative_path)
+        try:
+            mtimes[path] = os.path.getmtime(path)
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def get_reference_data():
+    """
+    获取当前参考数据版本。后台监控线程运行时直接返回已发布的版本，不在请求路径上做任何文件操作；
+    未启动监控时，每次获取检查源文件修改时间，变化后同步重新加载。
+    调用方应在一次处理任务开始时获取一次，并在整个任务中使用同一个对象。
+    """
+    current = _current
+    if current is not None and _watcher is not None and _watcher.is_alive():
+        return current
+    if current is not None and current.mtimes == _source_mtimes():
+        return current
+    return _publish(_build_reference_data())
+
+
+def reload_reference_data():
+    """
+    重新检查源文件，有变化时构建新版本并原子替换。新版本加载失败（例如文件正被覆盖写入）时
+    保留当前版本，返回是否发生了切换。
+    """
+    current = _current
+    if current is not None and current.mtimes == _source_mtimes():
+        return False
+    data = _build_reference_data()
+    if current is not None and data.errors:
+        logging.warning(f"新版本参考数据加载失败，继续使用版本 {current.version}：{data.errors}")
+        return False
+    if current is None or data.version != current.version:
+        data.warm_indexes()
+    switched = _publish(data) is not current
+    if switched:
+        # 新版本的词级错别字检测器也在请求路径之外构建
+        from .word_typos import warm_word_typo_detector
+
+        warm_word_typo_detector(data)
+    return switched
+
+
+def _watch_loop(interval):
+    try:
+        _current.warm_indexes()
+    except Exception as e:
+        logging.error(f"构建参考数据索引失败：{e}")
+    while True:
+        time.sleep(interval)
+        try:
+            reload_reference_data()
+        except Exception as e:
+            logging.error(f"参考数据热更新失败：{e}")
+
+
+def start_reference_watcher(interval=WATCH_INTERVAL_SECONDS):
+    """启动后台监控线程（每个进程只启动一次，重复调用无副作用）"""
+    global _current, _watcher
+    with _publish_lock:
+        if _watcher is not None and _watcher.is_alive():
+            return _watcher
+        if _current is None:
+            # 先同步发布一个版本，保证监控线程运行后 get_reference_data 总有数据可返回
+            _current = _build_reference_data()
+            archive_reference_version(_current)
+        _watcher = threading.Thread(target=_watch_loop, args=(interval,), name='reference-data-watcher', daemon=True)
+        _watcher.start()
+        logging.info(f"参考数据监控已启动（版本 {_current.version}，检查间隔 {interval} 秒）")
+        return _watcher
+
+
+def reference_cache_stats():
+    """返回缓存命中/未命中次数、累计加载耗时（秒）及各文件最近一次加载信息"""
+    with _cache_lock:
+        return {
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+            'load_seconds': _stats['load_seconds'],
+            'reloads': _stats['reloads'],
+            'files': {path: dict(info) for path, info in _stats['files'].items()},
+        }
+
+
+def clear_reference_cache():
+    """清空缓存（下次获取时重新读取 Excel）"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def build_reference_snapshot():
+    """重新解析两个参考数据 Excel 并写入快照，返回 {文件名: 条数}"""
+    snapshot = {'format': SNAPSHOT_FORMAT, 'entries': {}}
+    counts = {}
+    for relative_path, column in ((SCHOOL_DATA_FILE, SCHOOL_DATA_COLUMN), (MAJOR_DATA_FILE, MAJOR_DATA_COLUMN)):
+        path = resource_path(relative_path)
+        values = _read_column_set(path, column)
+        snapshot['entries'][relative_path] = {'column': column, 'sha256': _file_sha256(path), 'values': values}
+        counts[relative_path] = len(values)
+    _write_snapshot(snapshot)
+    clear_reference_cache()
+    return counts
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    for name, count in build_reference_snapshot().items():
+        logging.info(f"已写入快照 {SNAPSHOT_FILE}：{name} {count} 条")
@@ -0,0 +1,167 @@
+"""
+同一学校、同一省份内近似重复的专业备注聚类（学业桥数据处理，按整个文件进行）。
+
+analyze_and_fix 每次只看一条备注，发现不了"中外合作办学（学费4万）"与"中外合作办学(学费4万元)"这类写法不一致。
+这里把备注去掉标点、括号和空白后取字符二元组，计算 MinHash 签名并按 LSH 分段分桶，只比较落入同一桶的备注，
+二元组 Jaccard 相似度达到阈值的归为一类，整体接近线性时间，而不是两两比较。
+每一类中出现次数最多的写法作为规范写法，供批量统一备注。
+
+数字不同的备注（如学费4万与学费5万）含义不同，只在数字序列相同的备注之间聚类。
+"""
+import re
+import zlib
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# MinHash 签名长度、LSH 段数（每段 64 / 16 = 4 个值；Jaccard 0.7 的两条备注约 99% 会落入同一桶）
+REMARK_MINHASH_PERMUTATIONS = 64
+REMARK_LSH_BANDS = 16
+
+# 归为一类的最低二元组 Jaccard 相似度
+REMARK_CLUSTER_THRESHOLD = 0.7
+
+# 去掉标点后少于该长度的备注不参与聚类（太短的备注差一个字就是不同含义，如"师范"与"非师范"）
+REMARK_CLUSTER_MIN_LENGTH = 4
+
+# 每批计算签名的二元组个数上限（控制中间矩阵的内存）
+_SIGNATURE_BATCH_SHINGLES = 50000
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20261017)
+_PERM_A = _rng.integers(1, int(_PRIME), size=REMARK_MINHASH_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, int(_PRIME), size=REMARK_MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+_DIGITS = re.compile(r'\d+')
+_NON_WORD = re.compile(r'[\W_]+')
+
+# 把每段的几个签名值合成一个桶编号时使用的乘数（64 位溢出回绕）
+_BAND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _comparison_text(text):
+    """比较用的文本：全角转半角、小写，只保留文字和数字"""
+    return _NON_WORD.sub('', unicodedata.normalize('NFKC', text).lower())
+
+
+def _shingles(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _minhash_signatures(shingle_sets):
+    """每个二元组集合的 MinHash 签名，返回 (集合数, REMARK_MINHASH_PERMUTATIONS) 的数组"""
+    signatures = np.empty((len(shingle_sets), REMARK_MINHASH_PERMUTATIONS), dtype=np.uint64)
+    start = 0
+    while start < len(shingle_sets):
+        # 按二元组总数分批，每批把所有集合的哈希拼成一行，用 reduceat 按集合取最小值
+        end, total = start, 0
+        while end < len(shingle_sets) and (end == start or total + len(shingle_sets[end]) <= _SIGNATURE_BATCH_SHINGLES):
+            total += len(shingle_sets[end])
+            end += 1
+        batch = shingle_sets[start:end]
+        hashes = np.array([zlib.crc32(s.encode('utf-8')) for shingles in batch for s in shingles], dtype=np.uint64)
+        offsets = np.cumsum([0] + [len(shingles) for shingles in batch[:-1]])
+        values = (_PERM_A[:, None] * (hashes[None, :] % _PRIME) + _PERM_B[:, None]) % _PRIME
+        signatures[start:end] = np.minimum.reduceat(values, offsets, axis=1).T
+        start = end
+    return signatures
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _as_strings(values):
+    return [str(v) for v in np.asarray(values, dtype=object)]
+
+
+def _value_counts(remarks, groups):
+    """(分组, 备注) → 行数"""
+    frame = pd.DataFrame({'group': _as_strings(groups), 'remark': _as_strings(remarks)})
+    return frame.value_counts(sort=False).to_dict()
+
+
+def _band_keys(signatures):
+    """每个签名按 LSH 分段，每段合成一个 64 位桶编号：返回 (签名数, REMARK_LSH_BANDS) 的数组"""
+    bands = signatures.reshape(len(signatures), REMARK_LSH_BANDS, -1)
+    keys = np.zeros(bands.shape[:2], dtype=np.uint64)
+    for k in range(bands.shape[2]):
+        keys = keys * _BAND_MULTIPLIER + bands[:, :, k]
+    return keys
+
+
+def _cluster(keys):
+    """对 (分组, 备注) 聚类，返回 {(分组, 备注): 类编号}，只包含能与其他备注归为一类的备注"""
+    # 比较文本、二元组和签名按不同的备注计算，各分组共用
+    text_ids = {}
+    texts = []
+    items = []
+    item_texts = []
+    for group, remark in keys:
+        text_id = text_ids.get(remark)
+        if text_id is None:
+            text = _comparison_text(remark)
+            text_id = text_ids[remark] = len(texts) if len(text) >= REMARK_CLUSTER_MIN_LENGTH else -1
+            if text_id >= 0:
+                texts.append(text)
+        if text_id >= 0:
+            items.append((group, remark))
+            item_texts.append(text_id)
+    if len(items) < 2:
+        return {}
+    shingles = [_shingles(text) for text in texts]
+    band_keys = _band_keys(_minhash_signatures(shingles))
+    item_texts = np.array(item_texts)
+    # 只在同一分组、数字序列相同的备注之间比较
+    buckets, _ = pd.factorize(pd.Series([f"{group}\x00{','.join(_DIGITS.findall(texts[t]))}"
+                                         for (group, _), t in zip(items, item_texts)]))
+    n = len(items)
+    frame = pd.DataFrame({
+        'bucket': np.repeat(buckets, REMARK_LSH_BANDS),
+        'band': np.tile(np.arange(REMARK_LSH_BANDS), n),
+        'key': band_keys[item_texts].ravel(),
+        'item': np.repeat(np.arange(n), REMARK_LSH_BANDS),
+    })
+    # 落入同一桶的备注与桶中最先出现的备注组成候选对（桶内通常只有几种写法）
+    first = frame.groupby(['bucket', 'band', 'key'], sort=False)['item'].transform('first').to_numpy()
+    item = frame['item'].to_numpy()
+    pairs = np.unique(np.stack([item, first], axis=1)[item != first], axis=0)
+    parent = list(range(n))
+    for i, j in pairs:
+        root_i, root_j = _find(parent, i), _find(parent, j)
+        if root_i == root_j:
+            continue
+        a, b = shingles[item_texts[i]], shingles[item_texts[j]]
+        if a is b or len(a & b) / len(a | b) >= REMARK_CLUSTER_THRESHOLD:
+            parent[root_i] = root_j
+    roots = [_find(parent, i) for i in range(n)]
+    sizes = np.bincount(roots, minlength=n)
+    return {items[i]: root for i, root in enumerate(roots) if sizes[root] > 1}
+
+
+def cluster_remarks(remarks, groups):
+    """
+    同一分组内近似重复的备注聚类。remarks、groups 为等长序列，
+    返回 {(分组, 备注): 类编号}，只包含能与其他备注归为一类的备注。
+    """
+    return _cluster(_value_counts(remarks, groups))
+
+
+def suggest_canonical_remarks(remarks, groups):
+    """
+    与同组其他备注近似重复、且不是该类规范写法的行返回规范写法，其余行为空字符串（object 数组）。
+    规范写法为该类中出现次数最多的备注（次数相同时取排序靠前的）。
+    """
+    counts = _value_counts(remarks, groups)
+    clusters = _cluster(counts)
+    best = {}
+    for key, cluster in clusters.items():
+        candidate = (-counts[key], key[1])
+        if cluster not in best or candidate < best[cluster]:
+            best[cluster] = candidate
+    canonical = {key: best[cluster][1] for key, cluster in clusters.items() if best[cluster][1] != key[1]}
+    return np.array([canonical.get(key, '') for key in zip(_as_strings(groups), _as_strings(remarks))], dtype=object)
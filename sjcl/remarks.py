@@ -0,0 +1,484 @@
+"""
+专业备注检查与修正（学业桥数据处理）：统一括号、括号成对修正、去重、多余标点简化、错别字修正。
+
+同一上传文件中相同的备注（如"中外合作办学"、校区说明）会重复成千上万次，analyze_and_fix_cached
+按原始备注缓存结果（有容量上限的 LRU，进程内各数据块共享）；CUSTOM_WHITELIST 或 TYPO_DICT
+被修改后，下一次 check_remark_dictionaries() 时清空缓存。
+"""
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+
+CUSTOM_WHITELIST = {
+    "宏福校区", "沙河校区", "中外合作办学", "珠海校区", "江北校区", "津南校区", "开封校区",
+    "联合办学", "校企合作", "合作办学", "威海校区", "深圳校区", "苏州校区", "平果校区",
+    "江南校区", "合川校区", "长安校区", "崇安校区", "南校区", "东校区", "都市园艺", "甘肃兰州"
+}
+
+TYPO_DICT = {
+    "教助": "救助",
+    "指辉": "指挥",
+    "料学": "科学",
+    "话言": "语言",
+    "5十3": "5+3",
+    "5十3一体化": "5+3一体化",
+    "“5十3”一体化": "“5+3”一体化",
+    "5+31体化": "5+3一体化",
+    "5+3体化": "5+3一体化",
+    "色言": "色盲",
+    "NIT": "NIIT",
+    "色育": "色盲",
+    "人围": "入围",
+    "项月": "项目",
+    "币范类": "师范类",
+    "投课": "授课",
+    "就薄": "就读",
+    "电请": "申请",
+    "中国面": "中国画",
+    "火数民族": "少数民族",
+    "色自": "色盲",
+    "色盲色弱申报": "色盲色弱慎报",
+    "数学与应用数笑": "数学与应用数学",
+    "法学十": "法学+",
+    "浣海校区": "滨海校区",
+    "中溴": "中澳"
+}
+
+REGEX_PATTERNS = {
+    'excess_punct': re.compile(r'[，、。！？；,;.!? ]+'),
+    'outer_punct': re.compile(r'^[，、。！？；,;.!? ]+|[，、。！？；,;.!? ]+$'),
+    'consecutive_right': re.compile(r'）{2,}')
+}
+NESTED_PAREN_PATTERN = re.compile(r'（（(.*?)））')
+CONSECUTIVE_REPEAT_PATTERN = re.compile(r'（(.+?)）\s*（\1）')
+
+
+def similar(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def normalize_brackets(text):
+    """统一各种括号为中文括号并处理不完整括号"""
+    if pd.isna(text) or not str(text).strip():
+        return text
+    text = str(text).strip()
+
+    # 替换所有括号变体为中文括号
+    text = re.sub(r'[{\[【]', '（', text)  # 左括号
+    text = re.sub(r'[}\]】]', '）', text)  # 右括号
+    text = re.sub(r'[<《]', '（', text)  # 左书名号替换为左括号
+    text = re.sub(r'[>》]', '）', text)  # 右书名号替换为右括号
+
+    return text
+
+
+def clean_outer_punctuation(text):
+    """清理最外层括号外的标点符号"""
+    if pd.isna(text) or not str(text).strip():
+        return text
+    text = str(text).strip()
+    text = REGEX_PATTERNS['outer_punct'].sub('', text)
+    parts = re.split(r'(（.*?）)', text)
+    cleaned_parts = []
+    for part in parts:
+        if part.startswith('（') and part.endswith('）'):
+            cleaned_parts.append(part)
+        else:
+            cleaned_parts.append(REGEX_PATTERNS['outer_punct'].sub('', part))
+    return ''.join(cleaned_parts)
+
+
+# 括号变体 → 中文括号（与 normalize_brackets 相同的映射）
+BRACKET_TABLE = str.maketrans('{[【<《}]】>》', '（（（（（）））））')
+# 最外层标点 / 多余标点（与 REGEX_PATTERNS 中 outer_punct、excess_punct 的字符集相同）
+OUTER_PUNCT_CHARS = '，、。！？；,;.!? '
+# 判断空括号时从括号内容两端去掉的标点
+PAREN_PUNCT_CHARS = '，、,;；:：。！？.!? '
+
+
+def _first_char(m):
+    return m.group(0)[0]
+
+
+def analyze_and_fix(text):
+    """
+    一次切分扫描完成 统一括号、清理外层标点、括号成对修正、删除空括号和重复括号，连续标点用一次正则合并，再修正错别字。
+    结果与 _analyze_and_fix_multipass 完全一致；嵌套括号、多个未闭合括号、含换行的备注直接交给后者处理。
+    """
+    if pd.isna(text) or not str(text).strip():
+        return text, []
+
+    text = str(text).translate(BRACKET_TABLE).strip()
+    if '\n' in text:
+        return _analyze_and_fix_multipass(text)
+
+    # 按 clean_outer_punctuation 的方式切分：'（' 到其后第一个 '）' 为一组，其余为普通片段
+    parts = []   # (是否括号组, 内容)
+    pos = 0
+    length = len(text)
+    while pos < length:
+        start = text.find('（', pos)
+        end = text.find('）', start + 1) if start != -1 else -1
+        if end == -1:
+            parts.append((False, text[pos:].strip(OUTER_PUNCT_CHARS)))
+            break
+        content = text[start + 1:end]
+        if '（' in content:
+            return _analyze_and_fix_multipass(text)
+        if start > pos:
+            parts.append((False, text[pos:start].strip(OUTER_PUNCT_CHARS)))
+        parts.append((True, content))
+        pos = end + 1
+
+    if len(parts) == 1 and not parts[0][0] and parts[0][1] in CUSTOM_WHITELIST:
+        return parts[0][1], []
+
+    issues = []
+    # 普通片段中的 '）' 都是多余右括号；最后一个片段中未闭合的 '（' 补上右括号
+    unclosed = None
+    if parts and not parts[-1][0] and '（' in parts[-1][1]:
+        tail = parts[-1][1]
+        if tail.count('（') > 1:
+            return _analyze_and_fix_multipass(text)
+        head, _, content = tail.partition('（')
+        unclosed = (head, content)
+    removed_right = sum(part.count('）') for is_group, part in parts if not is_group)
+    issues.extend(["删除多余右括号1个"] * removed_right)
+    if unclosed is not None:
+        head, content = unclosed
+        parts[-1:] = [(False, head.replace('）', '')), (True, content)]
+        issues.append("补充缺失右括号1个")
+
+    # 删除空括号（或仅含标点）、重复括号
+    empty_issues = []
+    dedup_issues = []
+    seen = set()
+    out = []
+    for is_group, part in parts:
+        if is_group:
+            content = part.strip(PAREN_PUNCT_CHARS)
+            if not content:
+                empty_issues.append("删除空括号或仅含标点括号")
+                continue
+            if content in seen:
+                dedup_issues.append(f"重复括号内容：'{content}'")
+                continue
+            seen.add(content)
+            out.append(f'（{content}）')
+        elif removed_right:
+            out.append(part.replace('）', ''))
+        else:
+            out.append(part)
+    issues.extend(empty_issues)
+    issues.extend(dedup_issues)
+    text = ''.join(out)
+    # 多余标点简化（连续标点只保留第一个）
+    text = REGEX_PATTERNS['excess_punct'].sub(_first_char, text)
+
+    # ========== 错别字修正 ==========
+    text, typos = _get_typo_corrector().correct(text)
+    for typo, correct in typos:
+        issues.append(f"错别字：'{typo}'→'{correct}'")
+
+    return text, issues
+
+
+def _analyze_and_fix_multipass(text):
+    """逐步处理的原始实现（analyze_and_fix 处理不了的复杂备注使用，也作为其结果的对照）"""
+    if pd.isna(text) or not str(text).strip():
+        return text, []
+
+    text = normalize_brackets(text)
+    text = clean_outer_punctuation(text)
+    issues = []
+
+    if text in CUSTOM_WHITELIST:
+        return text, []
+
+    # ========== 括号成对修正 ==========
+    text_list = list(text)
+    stack = []
+    unmatched_right = []
+
+    for i, char in enumerate(text_list):
+        if char == '（':
+            stack.append(i)
+        elif char == '）':
+            if stack:
+                stack.pop()
+            else:
+                unmatched_right.append(i)
+
+    for i in reversed(unmatched_right):
+        del text_list[i]
+        issues.append("删除多余右括号1个")
+
+    if stack:
+        text_list.extend(['）'] * len(stack))
+        issues.append(f"补充缺失右括号{len(stack)}个")
+
+    text = ''.join(text_list)
+
+    # 嵌套修正
+    text, nested_count = NESTED_PAREN_PATTERN.subn(r'（\1）', text)
+    if nested_count > 0:
+        issues.append(f"修复嵌套括号{nested_count}处")
+
+    # ========== 清理空括号或纯标点括号 ==========
+    def clean_empty_paren(m):
+        content = m.group(1).strip('，、,;；:：。！？.!? ')
+        if not content:
+            issues.append("删除空括号或仅含标点括号")
+            return ''
+        return f'（{content}）'
+
+    text = re.sub(r'（(.*?)）', clean_empty_paren, text)
+
+    # ========== 去重 ==========
+    seen = set()
+
+    def dedup(m):
+        c = m.group(1)
+        if c in seen:
+            issues.append(f"重复括号内容：'{c}'")
+            return ''
+        seen.add(c)
+        return f'（{c}）'
+
+    text = re.sub(r'（(.*?)）', dedup, text)
+
+    # ========== 多余标点简化 ==========
+    text = REGEX_PATTERNS['excess_punct'].sub(lambda m: m.group(0)[0], text)
+
+    # ========== 错别字修正 ==========
+    text, typos = _get_typo_corrector().correct(text)
+    for typo, correct in typos:
+        issues.append(f"错别字：'{typo}'→'{correct}'")
+
+    return text, issues
+
+
+# ==================== 错别字自动机 ====================
+class TypoCorrector:
+    """
+    由 TYPO_DICT 构建的 Aho–Corasick 自动机：一次扫描判断备注中有没有错别字，绝大多数备注到此为止。
+    有错别字时与原实现相同，按 TYPO_DICT 的顺序逐个替换：前面替换产生的文本可被后面的错别字继续匹配
+    （"5十3体化"→"5+3体化"→"5+3一体化"），同一位置先列出的错别字优先（"5十3一体化"按"5十3"替换）。
+    """
+
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+        self._first_chars = frozenset(typo[0] for typo in self.mapping if typo)
+        self._goto = [{}]
+        self._fail = [0]
+        self._ends = [False]  # 该状态（含失败链上的状态）是否为某个错别字的结尾
+        for typo in self.mapping:
+            if not typo:
+                continue
+            state = 0
+            for char in typo:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._ends.append(False)
+                state = nxt
+            self._ends[state] = True
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._ends[nxt] = self._ends[nxt] or self._ends[self._fail[nxt]]
+                queue.append(nxt)
+
+    def has_typo(self, text):
+        """text 中是否出现任一错别字（一次扫描）"""
+        if self._first_chars.isdisjoint(text):
+            return False
+        goto, fail, ends = self._goto, self._fail, self._ends
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if ends[state]:
+                return True
+        return False
+
+    def correct(self, text):
+        """
+        返回 (替换后文本, [(错别字, 正确写法)])，按 TYPO_DICT 中的顺序排列；正确写法取自构建自动机时的字典，
+        TYPO_DICT 修改后尚未调用 check_remark_dictionaries 时结果仍与自动机一致
+        """
+        if not self.has_typo(text):
+            return text, []
+        found = []
+        for typo, correct in self.mapping.items():
+            if typo and typo in text:
+                text = text.replace(typo, correct)
+                found.append((typo, correct))
+        return text, found
+
+
+_typo_corrector = None
+
+
+def _get_typo_corrector():
+    if _typo_corrector is None:
+        check_remark_dictionaries()
+    return _typo_corrector
+
+
+# ==================== 备注检查结果缓存 ====================
+REMARK_CACHE_SIZE = 50000
+
+
+class RemarkCache:
+    """原始备注 → (修正后备注, 问题列表) 的 LRU 缓存，记录命中/未命中/淘汰次数"""
+
+    def __init__(self, maxsize=REMARK_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, text):
+        with self._lock:
+            value = self._data.get(text)
+            if value is not None:
+                self._data.move_to_end(text)
+                self.hits += 1
+                return value
+            self.misses += 1
+        fixed_text, issues = analyze_and_fix(text)
+        value = (fixed_text, tuple(issues))
+        with self._lock:
+            self._data[text] = value
+            self._data.move_to_end(text)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def check_fingerprint(self, fingerprint):
+        """字典内容与缓存建立时不同则清空缓存"""
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                if self._fingerprint is not None:
+                    self.invalidations += 1
+                self._data.clear()
+                self._fingerprint = fingerprint
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+_remark_cache = RemarkCache()
+
+
+def _dictionaries_fingerprint():
+    """CUSTOM_WHITELIST、TYPO_DICT 当前内容的指纹（TYPO_DICT 按顺序替换，顺序也计入）"""
+    return hash((frozenset(CUSTOM_WHITELIST), tuple(TYPO_DICT.items())))
+
+
+def remark_dictionaries_digest():
+    """与 _dictionaries_fingerprint 相同内容的稳定摘要（不随进程变化，可写入磁盘缓存）"""
+    content = repr((sorted(CUSTOM_WHITELIST), list(TYPO_DICT.items())))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+def check_remark_dictionaries():
+    """
+    检查白名单和错别字字典是否被修改，修改过则重建错别字自动机并清空缓存
+    （每个数据块调用一次，而不是每条备注；直接修改 TYPO_DICT 后也应调用一次）。
+    """
+    global _typo_corrector, _prescreen_pattern
+    if _typo_corrector is None or list(_typo_corrector.mapping.items()) != list(TYPO_DICT.items()):
+        _typo_corrector = TypoCorrector(TYPO_DICT)
+        _prescreen_pattern = _build_prescreen_pattern(TYPO_DICT)
+    _remark_cache.check_fingerprint(_dictionaries_fingerprint())
+
+
+# ==================== 备注预筛 ====================
+def _build_prescreen_pattern(typo_dict):
+    """
+    备注"可能被修改"的特征合成一个正则（命中不代表一定有问题，未命中则 analyze_and_fix 一定原样返回、无问题）：
+    非中文括号、括号不成对或嵌套、空括号或括号内容首尾为标点、重复括号内容、连续标点、
+    首尾标点或空白、紧挨括号外侧的标点、换行，以及任一错别字。
+    """
+    outer = re.escape(OUTER_PUNCT_CHARS)
+    paren = re.escape(PAREN_PUNCT_CHARS)
+    features = [
+        r'[{\[【<《}\]】>》]',
+        r'^[^（）]*）', r'（[^（）]*（', r'）[^（）]*）', r'（[^（）]*$',
+        rf'（[{paren}]', rf'[{paren}]）', r'（）',
+        r'（([^（）]+)）.*（\1）',
+        rf'[{outer}]{{2,}}', rf'^[{outer}\s]', rf'[{outer}\s]$', rf'[{outer}]（', rf'）[{outer}]',
+        r'\n',
+    ]
+    features.extend(re.escape(typo) for typo in sorted(typo_dict, key=len, reverse=True) if typo)
+    return re.compile('|'.join(features))
+
+
+_prescreen_pattern = None
+
+
+def remark_prescreen(remarks):
+    """
+    对整列备注做向量化预筛，返回 (需要检查, 为空) 两个布尔列：
+    为空的行结果为 无问题；既不为空也不需要检查的行 analyze_and_fix 必定原样返回，可直接判为 无问题。
+    """
+    if _prescreen_pattern is None:
+        check_remark_dictionaries()
+    text = remarks.astype(str)
+    blank = remarks.isna() | (text.str.strip() == '')
+    search = _prescreen_pattern.search
+    need_check = pd.Series([search(t) is not None for t in text], index=remarks.index, dtype=bool)
+    return need_check & ~blank, blank
+
+
+def analyze_and_fix_cached(text):
+    """带缓存的 analyze_and_fix，返回 (修正后备注, 问题列表)"""
+    if pd.isna(text) or not str(text).strip():
+        return text, []
+    if _remark_cache._fingerprint is None:
+        check_remark_dictionaries()
+    fixed_text, issues = _remark_cache.get(text)
+    return fixed_text, list(issues)
+
+
+def remark_cache_stats():
+    """返回缓存大小、命中/未命中/淘汰/失效次数和命中率"""
+    return _remark_cache.stats()
+
+
+def clear_remark_cache():
+    _remark_cache.clear()
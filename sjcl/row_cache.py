@@ -0,0 +1,139 @@
+"""
+学业桥数据处理的按行结果缓存：重新上传只改了少数行的同一文件时，只处理新增或修改过的行。
+
+每行按 process_chunk 读取的各列的值计算 64 位指纹，process_chunk 新增的各列结果按指纹保存到 xueyeqiao_row_cache.pkl。
+缓存带有上下文（缓存格式、参考数据版本、备注白名单/错别字字典摘要、参与指纹的列名和类型），
+上下文不同时整个缓存作废；行数超过 ROW_CACHE_MAX_ROWS 时丢弃最早写入的行。
+"""
+import os
+import pickle
+import logging
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .reference_data import resource_path
+
+ROW_CACHE_FILE = "xueyeqiao_row_cache.pkl"
+
+# process_chunk 的输出规则变化时加 1，使旧缓存作废
+ROW_CACHE_FORMAT = 4
+
+# 缓存保留的最多行数
+ROW_CACHE_MAX_ROWS = 300000
+
+# 合并各列哈希时使用的乘数（64 位溢出回绕）
+_HASH_MULTIPLIER = np.uint64(0x100000001b3)
+
+# Streamlit 的多个会话是同一进程中的线程：读取、更新、写入缓存文件时串行执行
+_cache_lock = threading.Lock()
+
+
+def fingerprint_rows(df):
+    """
+    每行输入值的 64 位指纹（uint64 数组）。object 列同时计入每个值的类型，
+    1、1.0、'1' 等转成字符串相同但处理结果可能不同的值指纹不同。
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            types = pd.util.hash_array(np.array([type(v).__name__ for v in df[col]], dtype=object))
+            hashes = hashes * _HASH_MULTIPLIER + types
+    return hashes
+
+
+class RowResultCache:
+    """指纹 → process_chunk 新增各列的结果（按列保存）"""
+
+    def __init__(self, path, context, columns=(), keys=None, values=None):
+        self.path = path
+        self.context = context
+        self.columns = list(columns)
+        self.keys = keys if keys is not None else np.empty(0, dtype=np.uint64)
+        self.values = values or {}
+
+    @classmethod
+    def load(cls, context, path=None):
+        """读取缓存文件；不存在、无法读取或上下文不同时返回空缓存"""
+        path = path or resource_path(ROW_CACHE_FILE)
+        try:
+            with _cache_lock, open(path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return cls(path, context)
+        except Exception as e:
+            logging.warning(f"读取按行结果缓存 {path} 失败，将重新处理全部行：{e}")
+            return cls(path, context)
+        if not isinstance(data, dict) or data.get('context') != context:
+            return cls(path, context)
+        if not _consistent(data):
+            logging.warning(f"按行结果缓存 {path} 的指纹与各列结果行数不一致，将重新处理全部行")
+            return cls(path, context)
+        return cls(path, context, data['columns'], data['keys'], data['values'])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, hashes):
+        """每行在缓存中的位置，未缓存的行为 -1"""
+        if not len(self.keys):
+            return np.full(len(hashes), -1, dtype=np.intp)
+        return pd.Index(self.keys).get_indexer(hashes)
+
+    def take_columns(self, positions):
+        """取出 positions 对应行的缓存结果：{列名: object 数组}"""
+        return {col: self.values[col][positions] for col in self.columns}
+
+    def take(self, positions, index):
+        """取出 positions 对应行的缓存结果，返回以 index 为索引的 DataFrame"""
+        return pd.DataFrame(self.take_columns(positions), index=index)
+
+    def update(self, hashes, results):
+        """写入本次各行的结果（results 为 process_chunk 新增的列 {列名: 数组}，与 hashes 逐行对应），本次的行排在最前"""
+        with _cache_lock:
+            self._update(hashes, results)
+
+    def _update(self, hashes, results):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        _, first = np.unique(hashes, return_index=True)
+        first.sort()
+        columns = list(results)
+        keys = hashes[first]
+        values = {col: np.asarray(results[col], dtype=object)[first] for col in columns}
+        if columns == self.columns and len(self.keys):
+            # 保留不在本次文件中的旧行
+            kept = ~pd.Index(self.keys).isin(keys)
+            keys = np.concatenate([keys, self.keys[kept]])
+            values = {col: np.concatenate([values[col], self.values[col][kept]]) for col in columns}
+        self.columns = columns
+        self.keys = keys[:ROW_CACHE_MAX_ROWS]
+        self.values = {col: v[:ROW_CACHE_MAX_ROWS] for col, v in values.items()}
+
+    def save(self):
+        """先写同目录下的唯一临时文件再替换；写入失败只记录日志"""
+        data = {'context': self.context, 'columns': self.columns, 'keys': self.keys, 'values': self.values}
+        tmp_path = None
+        try:
+            with _cache_lock:
+                fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(self.path)}.",
+                                                suffix='.tmp', dir=os.path.dirname(os.path.abspath(self.path)))
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"写入按行结果缓存 {self.path} 失败：{e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def _consistent(data):
+    """缓存文件内容完整：每一列都有结果，且各列结果与指纹行数相同"""
+    try:
+        keys = data['keys']
+        values = data['values']
+        return (isinstance(keys, np.ndarray) and keys.ndim == 1 and isinstance(values, dict)
+                and all(col in values and len(values[col]) == len(keys) for col in data['columns']))
+    except Exception:
+        return False
@@ -0,0 +1,441 @@
+"""
+院校分提取：普通类（process_score_file）与艺体类（process_new_template_file）。
+"""
+import pandas as pd
+
+
+# ============================
+# 院校分提取相关函数（普通类）
+# ============================
+expected_columns = [
+    '学校名称', '省份', '招生专业', '专业方向（选填）', '专业备注（选填）', '一级层次', '招生科类', '招生批次',
+    '招生类型（选填）', '最高分', '最低分', '平均分', '最低分位次（选填）', '招生人数（选填）', '数据来源',
+    '专业组代码', '首选科目', '选科要求', '次选科目', '专业代码', '招生代码', '录取人数（选填）'
+]
+columns_to_convert = [
+    '专业组代码', '专业代码', '招生代码', '最高分', '最低分', '最低分位次（选填）',
+    '招生人数（选填）'
+]
+
+
+def process_score_file(file_path):
+    import openpyxl
+    from openpyxl.styles import Alignment, numbers
+
+    # 首先读取年份（从B2单元格）
+    try:
+        wb = openpyxl.load_workbook(file_path, data_only=True)
+        ws = wb.active
+        year_value = ws['B2'].value
+        if year_value is None:
+            # 如果B2为空，尝试从数据中提取年份
+            year_value = ''
+        else:
+            year_value = str(year_value).strip()
+        wb.close()
+    except Exception as e:
+        year_value = ''
+
+    try:
+        df = pd.read_excel(file_path, header=2, dtype={
+            '专业组代码': str,
+            '专业代码': str,
+            '招生代码': str,
+            '最高分': str,
+            '最低分': str,
+            '最低分位次（选填）': str,
+            '招生人数（选填）': str,
+            '录取人数（选填）': str
+        }, keep_default_na=False, engine='openpyxl')
+    except Exception as e:
+        raise Exception(f"读取文件错误：{e}")
+
+    missing_columns = [col for col in expected_columns if col not in df.columns]
+    if missing_columns:
+        raise Exception(f"文件缺少以下列：{missing_columns}")
+
+    df['最低分'] = pd.to_numeric(df['最低分'], errors='coerce')
+    df['最高分'] = pd.to_numeric(df['最高分'], errors='coerce')
+    df['招生人数（选填）'] = pd.to_numeric(df['招生人数（选填）'], errors='coerce')
+    df['录取人数（选填）'] = pd.to_numeric(df['录取人数（选填）'], errors='coerce')
+    df = df.dropna(subset=['最低分'])
+
+    if df.empty:
+        raise Exception("数据处理后为空。")
+
+    df['招生类型（选填）'] = df['招生类型（选填）'].fillna('')
+
+    # 首选科目转换逻辑
+    if '首选科目' in df.columns:
+        df['首选科目'] = df['首选科目'].str.strip()  # 去除前后空格
+        df['首选科目'] = df['首选科目'].replace({
+            '历': '历史',
+            '物': '物理',
+            '历史': '历史',  # 确保已经是"历史"的不变
+            '物理': '物理'  # 确保已经是"物理"的不变
+        })
+
+    try:
+        # 判断是否有专业组代码列，且不全为空
+        if '专业组代码' in df.columns and df['专业组代码'].notna().any():
+            group_fields = ['学校名称', '省份', '一级层次', '招生科类', '招生批次', '招生类型（选填）', '专业组代码']
+        else:
+            group_fields = ['学校名称', '省份', '一级层次', '招生科类', '招生批次', '招生类型（选填）']
+
+        # 每组最低分所在行
+        min_indices = df.groupby(group_fields)['最低分'].idxmin()
+
+        # 每组最高分
+        max_scores = df.groupby(group_fields)['最高分'].max()
+
+        # 取最低分行
+        result = df.loc[min_indices].copy()
+
+        # 补充最高分
+        def get_max_score(row):
+            key = tuple(row[col] for col in group_fields)
+            return max_scores.get(key, None)
+
+        result['最高分'] = result.apply(get_max_score, axis=1)
+
+        # 招生人数、录取人数按分组总和
+        enroll_groups = df.groupby(group_fields)['招生人数（选填）'].sum()
+        code_groups = df.groupby(group_fields)['录取人数（选填）'].sum()
+
+        def get_group_total(row, column_name):
+            key = tuple(row[col] for col in group_fields)
+            if column_name == '招生人数（选填）':
+                return enroll_groups.get(key, '')
+            elif column_name == '录取人数（选填）':
+                return code_groups.get(key, '')
+            return ''
+
+        result['招生人数（选填）'] = result.apply(lambda row: get_group_total(row, '招生人数（选填）'), axis=1)
+        result['录取人数（选填）'] = result.apply(lambda row: get_group_total(row, '录取人数（选填）'), axis=1)
+
+    except Exception as e:
+        raise Exception(f"分组字段错误：{e}")
+
+    if result.empty:
+        raise Exception("筛选结果为空。")
+
+    # 构建新的数据框，按照新的列顺序
+    new_columns = [
+        '学校名称', '省份', '招生类别', '招生批次', '招生类型', '选测等级',
+        '最高分', '最低分', '平均分', '最高位次', '最低位次', '平均位次',
+        '录取人数', '招生人数', '数据来源', '省控线科类', '省控线批次', '省控线备注',
+        '专业组代码', '首选科目', '院校招生代码'
+    ]
+
+    # 创建新的DataFrame，确保所有列都有正确的长度
+    num_rows = len(result)
+    new_result = pd.DataFrame(index=range(num_rows))
+
+    # 辅助函数：处理列值，将NaN转换为空字符串（用于文本列）
+    def get_col_values(col_name, default=''):
+        if col_name in result.columns:
+            values = result[col_name].fillna(default).astype(str).values
+            # 将'nan'字符串转换回空字符串
+            values = ['' if str(v).lower() == 'nan' else v for v in values]
+            return values
+        else:
+            return [default] * num_rows
+
+    # 辅助函数：处理数字列值，保持数字类型
+    def get_numeric_values(col_name, default=0):
+        if col_name in result.columns:
+            values = result[col_name].fillna(default)
+            # 尝试转换为数字，无法转换的保持原值或设为默认值
+            try:
+                return pd.to_numeric(values, errors='coerce').fillna(default).values
+            except:
+                return [default] * num_rows
+        else:
+            return [default] * num_rows
+
+    new_result['学校名称'] = get_col_values('学校名称')
+    new_result['省份'] = get_col_values('省份')
+    new_result['招生类别'] = get_col_values('招生科类')
+    new_result['招生批次'] = get_col_values('招生批次')
+    new_result['招生类型'] = get_col_values('招生类型（选填）')
+    new_result['选测等级'] = [''] * num_rows  # 新字段，设为空
+    new_result['最高分'] = get_col_values('最高分')
+    new_result['最低分'] = get_col_values('最低分')
+    new_result['平均分'] = [''] * num_rows  # 删除平均分提取逻辑，设为空
+    new_result['最高位次'] = [''] * num_rows  # 新字段，设为空
+    new_result['最低位次'] = get_col_values('最低分位次（选填）')
+    new_result['平均位次'] = [''] * num_rows  # 新字段，设为空
+    new_result['录取人数'] = get_numeric_values('录取人数（选填）', default=0)  # 保持数字格式
+    new_result['招生人数'] = get_numeric_values('招生人数（选填）', default=0)  # 保持数字格式
+    new_result['数据来源'] = get_col_values('数据来源')
+    new_result['省控线科类'] = [''] * num_rows  # 新字段，设为空
+    new_result['省控线批次'] = [''] * num_rows  # 新字段，设为空
+    new_result['省控线备注'] = [''] * num_rows  # 新字段，设为空
+    new_result['专业组代码'] = get_col_values('专业组代码')
+    new_result['首选科目'] = get_col_values('首选科目')
+    new_result['院校招生代码'] = get_col_values('招生代码')
+
+    output_path = file_path.replace('.xlsx', '_院校分.xlsx')
+
+    try:
+        # 创建备注文本
+        remark_text = """备注：请删除示例后再填写；
+1.省份：必须填写各省份简称，例如：北京、内蒙古，不能带有市、省、自治区、空格、特殊字符等
+2.科类：浙江、上海限定"综合、艺术类、体育类"，内蒙古限定"文科、理科、蒙授文科、蒙授理科、艺术类、艺术文、艺术理、体育类、体育文、体育理、蒙授艺术、蒙授体育"，其他省份限定"文科、理科、艺术类、艺术文、艺术理、体育类、体育文、体育理"
+3.批次：（以下为19年使用批次）
+    北京、天津、辽宁、上海、山东、广东、海南限定本科提前批、本科批、专科提前批、专科批、国家专项计划本科批、地方专项计划本科批；
+    河北、内蒙古、吉林、江苏、安徽、福建、江西、河南、湖北、广西、重庆、四川、贵州、云南、西藏、陕西、甘肃、宁夏、新疆限定本科提前批、本科一批、本科二批、专科提前批、专科批、国家专项计划本科批、地方专项计划本科批；
+    黑龙江、湖南、青海限定本科提前批、本科一批、本科二批、本科三批、专科提前批、专科批、国家专项计划本科批、地方专项计划本科批；
+    山西限定本科一批A段、本科一批B段、本科二批A段、本科二批B段、本科二批C段、专科批、国家专项计划本科批、地方专项计划本科批；
+    浙江限定普通类提前批、平行录取一段、平行录取二段、平行录取三段
+4.最高分、最低分、平均分：仅能填写数字（最多保留2位小数），且三者顺序不能改变，最低分为必填项，其中艺术类和体育类分数为文化课分数
+5.最低分位次：仅能填写数字
+6.录取人数：仅能填写数字
+7.首选科目：新八省必填，只能填写（历史或物理）"""
+
+        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            # 先写入数据（不包含标题，从第4行开始）
+            new_result.to_excel(writer, index=False, header=False, startrow=3)
+            workbook = writer.book
+            worksheet = writer.sheets['Sheet1']
+
+            # 第一行：合并A1-U1并写入备注
+            worksheet.merge_cells('A1:U1')
+            worksheet['A1'] = remark_text
+            worksheet['A1'].alignment = Alignment(wrap_text=True, vertical='top')
+            # 设置第一行行高为215磅
+            worksheet.row_dimensions[1].height = 215
+
+            # 第二行：A2="招生年"，B2=年份，C2="1"，D2="模板类型（模板标识不要更改）"
+            worksheet['A2'] = '招生年'
+            # B2和C2设置为数字格式
+            try:
+                # 尝试将年份转换为数字
+                if year_value and str(year_value).strip():
+                    year_num = int(float(str(year_value).strip()))
+                    worksheet['B2'] = year_num
+                else:
+                    worksheet['B2'] = ''
+            except:
+                worksheet['B2'] = year_value
+            worksheet['C2'] = 1  # 直接设置为数字1
+            worksheet['D2'] = '模板类型（模板标识不要更改）'
+
+            # 第三行：标题行
+            headers = ['学校名称', '省份', '招生类别', '招生批次', '招生类型', '选测等级',
+                       '最高分', '最低分', '平均分', '最高位次', '最低位次', '平均位次',
+                       '录取人数', '招生人数', '数据来源', '省控线科类', '省控线批次', '省控线备注',
+                       '专业组代码', '首选科目', '院校招生代码']
+            for col_idx, header in enumerate(headers, start=1):
+                worksheet.cell(row=3, column=col_idx, value=header)
+
+            # 设置文本格式（从第4行开始，即数据行）
+            # 需要设置为文本格式的列（使用新列名，不包括招生人数和录取人数）
+            text_format_cols = ['专业组代码', '院校招生代码', '最高分', '最低分', '最低位次']
+            for col in text_format_cols:
+                if col in new_result.columns:
+                    col_idx = new_result.columns.get_loc(col) + 1
+                    for row in range(4, len(new_result) + 4):
+                        worksheet.cell(row=row, column=col_idx).number_format = numbers.FORMAT_TEXT
+
+            # 确保B2和C2单元格保持数字格式
+            if worksheet['B2'].value is not None and str(worksheet['B2'].value).strip():
+                try:
+                    worksheet['B2'].value = int(float(str(worksheet['B2'].value)))
+                except:
+                    pass
+            worksheet['C2'].value = 1
+
+            # 确保"录取人数"和"招生人数"列保持数字格式（从第4行开始）
+            if '录取人数' in new_result.columns:
+                col_idx = new_result.columns.get_loc('录取人数') + 1
+                for row in range(4, len(new_result) + 4):
+                    cell = worksheet.cell(row=row, column=col_idx)
+                    if cell.value is not None:
+                        try:
+                            cell.value = float(cell.value) if str(cell.value).strip() else 0
+                        except:
+                            pass
+
+            if '招生人数' in new_result.columns:
+                col_idx = new_result.columns.get_loc('招生人数') + 1
+                for row in range(4, len(new_result) + 4):
+                    cell = worksheet.cell(row=row, column=col_idx)
+                    if cell.value is not None:
+                        try:
+                            cell.value = float(cell.value) if str(cell.value).strip() else 0
+                        except:
+                            pass
+
+        return output_path
+    except Exception as e:
+        raise Exception(f"文件保存失败：{e}")
+
+
+# ============================
+# 院校分数据处理（艺体类）
+# ============================
+
+expected_new_columns = [
+    '学校名称', '省份', '专业', '专业方向（选填）', '专业备注（选填）', '专业层次',
+    '专业类别', '是否校考', '招生类别', '招生批次', '最低分', '最低分位次（选填）',
+    '专业组代码', '首选科目', '选科要求', '次选科目', '招生代码', '校统考分',
+    '校文化分', '专业代码', '数据来源'
+]
+columns_to_convert_new = [
+    '专业组代码', '专业代码', '招生代码', '最低分', '最低分位次（选填）',
+    '校统考分', '校文化分'
+]
+
+
+def process_new_template_file(file_path):
+    import openpyxl
+    from openpyxl.styles import Alignment, numbers
+
+    # 首先读取原始文件的B2单元格内容
+    try:
+        wb_original = openpyxl.load_workbook(file_path, data_only=True)
+        ws_original = wb_original.active
+        b2_value = ws_original['B2'].value
+        if b2_value is None:
+            b2_value = ''
+        else:
+            b2_value = str(b2_value).strip()
+        wb_original.close()
+    except Exception as e:
+        b2_value = ''
+
+    try:
+        df = pd.read_excel(file_path, header=2, dtype={
+            '专业组代码': str,
+            '专业代码': str,
+            '招生代码': str,
+            '最低分': str,
+            '最低分位次（选填）': str,
+            '校统考分': str,
+            '校文化分': str
+        }, keep_default_na=False, engine='openpyxl')
+    except Exception as e:
+        raise Exception(f"读取文件错误：{e}")
+
+    # 检查必需列
+    missing_columns = [col for col in expected_new_columns if col not in df.columns]
+    if missing_columns:
+        raise Exception(f"文件缺少以下列：{missing_columns}")
+
+    # 数值列转为数值型
+    df['最低分'] = pd.to_numeric(df['最低分'], errors='coerce')
+    df['校统考分'] = pd.to_numeric(df['校统考分'], errors='coerce')
+    df['校文化分'] = pd.to_numeric(df['校文化分'], errors='coerce')
+
+    # 删除最低分为空的行
+    df = df.dropna(subset=['最低分'])
+    if df.empty:
+        raise Exception("数据处理后为空。")
+
+    # 首选科目清洗
+    if '首选科目' in df.columns:
+        df['首选科目'] = df['首选科目'].str.strip()
+        df['首选科目'] = df['首选科目'].replace({
+            '历': '历史',
+            '物': '物理',
+            '历史': '历史',
+            '物理': '物理'
+        })
+
+    try:
+        # 判断分组字段
+        if '专业组代码' in df.columns and df['专业组代码'].notna().any():
+            group_fields = ['学校名称', '省份', '专业方向（选填）', '专业层次', '专业类别', '招生类别', '招生批次',
+                            '专业组代码']
+        else:
+            group_fields = ['学校名称', '省份', '专业方向（选填）', '专业层次', '专业类别', '招生类别', '招生批次']
+
+        # 每组最低分所在行
+        min_indices = df.groupby(group_fields)['最低分'].idxmin()
+
+        # 取最低分行
+        result = df.loc[min_indices].copy()
+
+    except Exception as e:
+        raise Exception(f"分组字段错误：{e}")
+
+    if result.empty:
+        raise Exception("筛选结果为空。")
+
+    # 准备新的列名映射
+    new_columns = ['学校名称', '省份', '招生类别', '招生批次', '专业类别', '投档分', '位次', '招生代码', '专业组', '备注', '是否校考']
+    
+    # 创建新的DataFrame，映射字段
+    new_result = pd.DataFrame()
+    new_result['学校名称'] = result['学校名称'] if '学校名称' in result.columns else pd.Series([None] * len(result))
+    new_result['省份'] = result['省份'] if '省份' in result.columns else pd.Series([None] * len(result))
+    new_result['招生类别'] = result['招生类别'] if '招生类别' in result.columns else pd.Series([None] * len(result))
+    new_result['招生批次'] = result['招生批次'] if '招生批次' in result.columns else pd.Series([None] * len(result))
+    new_result['专业类别'] = result['专业类别'] if '专业类别' in result.columns else pd.Series([None] * len(result))
+    new_result['投档分'] = result['最低分'] if '最低分' in result.columns else pd.Series([None] * len(result))
+    new_result['位次'] = result['最低分位次（选填）'] if '最低分位次（选填）' in result.columns else pd.Series([None] * len(result))
+    new_result['招生代码'] = result['招生代码'] if '招生代码' in result.columns else pd.Series([None] * len(result))
+    new_result['专业组'] = result['专业组代码'] if '专业组代码' in result.columns else pd.Series([None] * len(result))
+    new_result['备注'] = result['专业备注（选填）'] if '专业备注（选填）' in result.columns else pd.Series([None] * len(result))
+    # 是否校考：如果存在则使用，否则默认为'否'
+    if '是否校考' in result.columns:
+        new_result['是否校考'] = result['是否校考'].fillna('否')
+    else:
+        new_result['是否校考'] = '否'
+
+    # 输出文件路径
+    output_path = file_path.replace('.xlsx', '_院校分.xlsx')
+
+    try:
+        # 创建新的工作簿
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'Sheet1'
+
+        # 第一行：A1-K1合并单元格，行高90磅
+        ws.merge_cells('A1:K1')
+        cell_a1 = ws['A1']
+        cell_a1.value = '备注：请删除示例后再填写；\n1.省份：必须填写各省份简称，例如：北京、内蒙古，不能带有市、省、自治区、空格、特殊字符等\n2.最低分位次：仅能填写数字\n3.录取人数：仅能填写数字\n4.是否校考：有效值【是，否】，不填写或不在有效值中默认\'否\''
+        cell_a1.alignment = Alignment(wrap_text=True, vertical='top', horizontal='left')
+        ws.row_dimensions[1].height = 90
+
+        # 第二行：A2="招生年"，B2=原始文件B2的内容
+        ws['A2'] = '招生年'
+        ws['B2'] = b2_value
+
+        # 第三行：标题行
+        for col_idx, col_name in enumerate(new_columns, start=1):
+            ws.cell(row=3, column=col_idx, value=col_name)
+
+        # 第四行开始：数据行
+        for row_idx, (_, row_data) in enumerate(new_result.iterrows(), start=4):
+            ws.cell(row=row_idx, column=1, value=row_data['学校名称'] if pd.notna(row_data['学校名称']) else None)
+            ws.cell(row=row_idx, column=2, value=row_data['省份'] if pd.notna(row_data['省份']) else None)
+            ws.cell(row=row_idx, column=3, value=row_data['招生类别'] if pd.notna(row_data['招生类别']) else None)
+            ws.cell(row=row_idx, column=4, value=row_data['招生批次'] if pd.notna(row_data['招生批次']) else None)
+            ws.cell(row=row_idx, column=5, value=row_data['专业类别'] if pd.notna(row_data['专业类别']) else None)
+            ws.cell(row=row_idx, column=6, value=row_data['投档分'] if pd.notna(row_data['投档分']) else None)
+            ws.cell(row=row_idx, column=7, value=row_data['位次'] if pd.notna(row_data['位次']) else None)
+            ws.cell(row=row_idx, column=8, value=row_data['招生代码'] if pd.notna(row_data['招生代码']) else None)
+            ws.cell(row=row_idx, column=9, value=row_data['专业组'] if pd.notna(row_data['专业组']) else None)
+            ws.cell(row=row_idx, column=10, value=row_data['备注'] if pd.notna(row_data['备注']) else None)
+            ws.cell(row=row_idx, column=11, value=row_data['是否校考'] if pd.notna(row_data['是否校考']) else '否')
+
+        # 设置文本格式（从第4行开始，即数据行）
+        # 需要设置为文本格式的列
+        text_format_cols = ['招生代码', '专业组', '位次']
+        for col_name in text_format_cols:
+            col_idx = new_columns.index(col_name) + 1
+            for row in range(4, len(new_result) + 4):
+                cell = ws.cell(row=row, column=col_idx)
+                if cell.value is not None:
+                    # 将值转换为字符串，然后设置为文本格式
+                    cell.value = str(cell.value)
+                    cell.number_format = numbers.FORMAT_TEXT
+
+        # 保存文件
+        wb.save(output_path)
+        return output_path
+    except Exception as e:
+        raise Exception(f"文件保存失败：{e}")
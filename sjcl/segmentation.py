@@ -0,0 +1,164 @@
+"""
+一分一段数据处理：补断点、校验累计人数与分数差。
+"""
+import os
+
+
+# ============================
+# 一分一段数据处理
+# ============================
+
+def process_segmentation_file(file_path):
+    import openpyxl
+    from openpyxl.styles import PatternFill
+
+    output_path = os.path.splitext(file_path)[0] + "_校验结果.xlsx"
+    wb = openpyxl.load_workbook(file_path)
+    ws = wb.active
+
+    ws['E7'] = '累计人数校验结果'
+    ws['F7'] = '分数校验结果'
+    ws['F2'] = '年份校验'
+
+    # 校验 B2 是否为 2025
+    if ws['B2'].value != 2025:
+        ws['G2'] = f"× 应为2025，当前为：{ws['B2'].value}"
+    else:
+        ws['G2'] = "√"
+
+    region = ws['B3'].value
+    suffix = "-750"
+    if region == "上海":
+        suffix = "-660"
+    elif region == "海南":
+        suffix = "-900"
+
+    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+
+    # ---------- 第8行特殊处理 ----------
+    row = 8
+    curr_score = ws[f"A{row}"].value
+    curr_num = ws[f"B{row}"].value
+    curr_total = ws[f"C{row}"].value
+
+    try:
+        score_int = int(float(str(curr_score).split('-')[0]))
+    except:
+        score_int = None
+
+    inserted = False
+    if curr_total is not None:
+        if curr_num is None or curr_num == "":
+            # 没有人数 → 自动计算
+            if row == 8:
+                ws[f"B{row}"] = curr_total
+            else:
+                prev_total = ws[f"C{row - 1}"].value
+                if prev_total is not None:
+                    ws[f"B{row}"] = curr_total - prev_total
+        else:
+            # 有人数和累计人数不一致时插入补断点行
+            if curr_num != curr_total:
+                try:
+                    insert_score = score_int + 1
+                    insert_num = curr_total - curr_num
+                    ws.insert_rows(row)
+                    ws[f"A{row}"] = f"{insert_score}{suffix}"  # ✅ 仅加后缀在新增行
+                    ws[f"B{row}"] = insert_num
+                    ws[f"C{row}"] = insert_num
+                    for col in ['A', 'B', 'C', 'E', 'F']:
+                        ws[f"{col}{row}"].fill = yellow_fill
+                    ws[f"E{row}"] = "补断点"
+                    ws[f"F{row}"] = "补断点"
+                    inserted = True
+                except:
+                    pass
+
+    # 仅当没有插入行时，第8行加后缀
+    if not inserted and score_int is not None:
+        ws[f"A{row}"] = f"{score_int}{suffix}"
+
+    # ---------- 补断点逻辑 ----------
+    while row < ws.max_row:
+        curr = ws[f"A{row}"].value
+        next = ws[f"A{row + 1}"].value
+        try:
+            curr_score_int = int(str(curr).split('-')[0])
+            next_score_int = int(str(next).split('-')[0])
+        except:
+            row += 1
+            continue
+
+        if curr_score_int - next_score_int > 1:
+            missing_score = curr_score_int - 1
+            ws.insert_rows(row + 1)
+            ws[f"A{row + 1}"] = missing_score
+            ws[f"B{row + 1}"] = 0
+            ws[f"C{row + 1}"] = ws[f"C{row}"].value
+            for col in ['A', 'B', 'C', 'E', 'F']:
+                ws[f"{col}{row + 1}"].fill = yellow_fill
+            ws[f"E{row + 1}"] = "补断点"
+            ws[f"F{row + 1}"] = "补断点"
+        else:
+            row += 1
+
+    # ---------- 校验与自动补人数 ----------
+    for row in range(8, ws.max_row + 1):
+        curr_score = ws[f"A{row}"].value
+        curr_num = ws[f"B{row}"].value
+        curr_total = ws[f"C{row}"].value
+        prev_total = ws[f"C{row - 1}"].value if row > 8 else None
+        prev_score = ws[f"A{row - 1}"].value if row > 8 else None
+
+        # 自动补人数
+        if (curr_num is None or curr_num == "") and curr_total is not None:
+            if row == 8:
+                ws[f"B{row}"] = curr_total
+                curr_num = curr_total
+            elif prev_total is not None:
+                try:
+                    calc = curr_total - prev_total
+                    ws[f"B{row}"] = calc
+                    curr_num = calc
+                except:
+                    pass
+
+        # 校验累计人数
+        if row == 8:
+            # 第8行直接标记正确（假设第8行累计人数正确）
+            if ws[f"E{row}"].value != "补断点":
+                ws[f"E{row}"] = "√"
+            correct_total = curr_total
+        else:
+            if curr_num is not None and curr_total is not None and correct_total is not None:
+                expected_total = correct_total + curr_num
+                if expected_total == curr_total:
+                    if ws[f"E{row}"].value != "补断点":
+                        ws[f"E{row}"] = "√"
+                    correct_total = curr_total  # 本行累计正确，用它更新基准
+                else:
+                    if ws[f"E{row}"].value != "补断点":
+                        ws[f"E{row}"] = f"× 应为{expected_total}"
+                    correct_total = expected_total
+
+        # 校验分数差
+        try:
+            curr_score_num = float(str(curr_score).split('-')[0])
+            prev_score_num = float(str(prev_score).split('-')[0])
+        except:
+            curr_score_num = prev_score_num = None
+
+        if curr_score_num is not None and prev_score_num is not None:
+            diff = prev_score_num - curr_score_num
+            if diff == 1:
+                if ws[f"F{row}"].value != "补断点":
+                    ws[f"F{row}"] = "√"
+            else:
+                if ws[f"F{row}"].value != "补断点":
+                    ws[f"F{row}"] = f"× 差值{diff}"
+        else:
+            if ws[f"F{row}"].value != "补断点":
+                ws[f"F{row}"] = "× 分数非数字，无法校验"
+
+    wb.save(output_path)
+    return output_path
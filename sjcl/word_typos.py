@@ -0,0 +1,251 @@
+"""
+专业备注的词级错别字检测（jieba 分词）。
+
+TYPO_DICT 只能修正列举过的错别字；这里用 jieba 分词，找出备注中 jieba 词典之外的词或被拆成单字的片段，
+若它所在的连续汉字片段与某个已知词只差一个字（如"中外合做办学"→"中外合作办学"），标记为疑似错别字。
+已知词为参考数据中的专业名称和 CUSTOM_WHITELIST，同时作为 jieba 的用户词典，保证它们不被拆开。
+
+jieba 加载词典约需 1 秒，start_jieba_preload() 在启动时用后台线程加载（每个进程一次），
+处理数据时通常已加载完成；参考数据版本或白名单变化时用新的分词器构建新检测器，最近几个版本的检测器都保留
+（热更新后仍在使用旧版本的任务与新任务交替运行时不必反复重建），热更新时由监控线程预先构建新版本的检测器。
+检测结果按备注缓存。
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+from .remarks import CUSTOM_WHITELIST, REMARK_CACHE_SIZE
+
+# 参与检测的已知词最短长度（更短的词只差一个字时多为不同的词，如"南校区"与"北校区"）
+WORD_TYPO_MIN_LENGTH = 4
+
+# 用户词典中词的词频（足够大，使分词时保留整个专业名称）
+USER_WORD_FREQ = 2000
+
+# 保留的检测器个数（当前版本和热更新前的版本；每个检测器有自己的 jieba 分词器，各占数十 MB）
+DETECTOR_CACHE_SIZE = 2
+
+_jieba_loaded = False
+# 预加载得到、尚未交给检测器的分词器（第一个检测器直接使用，不再加载一次词典）
+_spare_tokenizer = None
+_tokenizer_ready = threading.Event()
+_preload_thread = None
+_preload_lock = threading.Lock()
+
+# (参考数据版本, CUSTOM_WHITELIST) → 检测器，最近使用的排在最后
+_detectors = OrderedDict()
+_detector_lock = threading.Lock()
+# 构建检测器约需 1～2 秒，单独加锁：构建期间其他线程仍可取得已有版本的检测器
+_build_lock = threading.Lock()
+
+
+def _is_chinese(text):
+    return all('\u4e00' <= ch <= '\u9fff' for ch in text)
+
+
+class WordTypoDetector:
+    """
+    已知词的"通配键"索引：每个词的每个位置换成 * 得到一个键（如 中外合*办学），
+    与已知词只差一个字的片段换掉该字后能查到这个词；对应多个词的键有歧义，不使用。
+    """
+
+    def __init__(self, tokenizer, words, cache_size=REMARK_CACHE_SIZE):
+        self.tokenizer = tokenizer
+        self.words = frozenset(w for w in words if len(w) >= WORD_TYPO_MIN_LENGTH and _is_chinese(w))
+        self.max_length = max((len(w) for w in self.words), default=0)
+        patterns = {}
+        for word in self.words:
+            for i in range(len(word)):
+                key = f"{word[:i]}*{word[i + 1:]}"
+                patterns[key] = word if key not in patterns else None
+        self._patterns = {key: word for key, word in patterns.items() if word is not None}
+        # 与已知词只差一个字的片段，开头两字或末尾两字必与该词相同（词长至少 4）：按首、尾二字索引已知词的长度
+        self._lengths_by_head = {}
+        self._lengths_by_tail = {}
+        for word in self.words:
+            self._lengths_by_head.setdefault(word[:2], set()).add(len(word))
+            self._lengths_by_tail.setdefault(word[-2:], set()).add(len(word))
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _suspicious(self, token):
+        """jieba 词典之外的词，或被拆成单字的汉字"""
+        return _is_chinese(token) and (len(token) == 1 or not self.tokenizer.FREQ.get(token))
+
+    def _known_edge(self, span, pos):
+        """
+        换的是片段首字或末字，且去掉该字后是已知词：多为已知词旁边的普通字
+        （如"含生物技术及应用"与"微生物技术及应用"），不是错别字。
+        """
+        if pos == 0:
+            rest = span[1:]
+        elif pos == len(span) - 1:
+            rest = span[:-1]
+        else:
+            return False
+        return rest in self.words or bool(self.tokenizer.FREQ.get(rest))
+
+    def _typo_at(self, span, positions):
+        """span 换掉 positions 中某一位置的字后能唯一确定一个已知词，且换的不是已知词旁边的普通字"""
+        if span in self.words:
+            return False
+        for pos in positions:
+            if f"{span[:pos]}*{span[pos + 1:]}" in self._patterns and not self._known_edge(span, pos):
+                return True
+        return False
+
+    def may_have_typo(self, text):
+        """
+        不分词的预筛：备注中没有与已知词只差一个字的片段时返回 False，detect 必定没有结果，可以跳过分词。
+        换的字在后半时开头两字不变、在前半时末尾两字不变，按首尾二字索引的词长取片段查通配键。
+        """
+        if not self._patterns or not text:
+            return False
+        for i in range(len(text) - 1):
+            pair = text[i:i + 2]
+            for length in self._lengths_by_head.get(pair, ()):
+                span = text[i:i + length]
+                if len(span) == length and self._typo_at(span, range(2, length)):
+                    return True
+            for length in self._lengths_by_tail.get(pair, ()):
+                start = i + 2 - length
+                if start >= 0 and self._typo_at(text[start:i + 2], range(length - 2)):
+                    return True
+        return False
+
+    def _scan(self, text):
+        tokens = self.tokenizer.lcut(text)
+        found = []
+        for i in range(len(tokens)):
+            span = ''
+            suspicious_positions = []
+            for token in tokens[i:]:
+                if not _is_chinese(token) or len(span) + len(token) > self.max_length:
+                    break
+                if self._suspicious(token):
+                    suspicious_positions.extend(range(len(span), len(span) + len(token)))
+                span += token
+                if len(span) < WORD_TYPO_MIN_LENGTH or not suspicious_positions or span in self.words:
+                    continue
+                for pos in suspicious_positions:
+                    if self._known_edge(span, pos):
+                        continue
+                    word = self._patterns.get(f"{span[:pos]}*{span[pos + 1:]}")
+                    if word is not None:
+                        found.append((span, word))
+                        break
+        # 重叠的片段只保留最长的一个
+        issues = []
+        seen = []
+        for span, word in sorted(found, key=lambda item: -len(item[0])):
+            if not any(span in longer for longer in seen):
+                seen.append(span)
+                issues.append(f"疑似错别字：'{span}'→'{word}'")
+        return tuple(issues)
+
+    def detect(self, text):
+        """返回备注中的疑似错别字说明（元组，按片段长度从长到短）；预筛未命中的备注不分词，直接返回空元组"""
+        if not self._patterns or not text:
+            return ()
+        with self._lock:
+            value = self._cache.get(text)
+            if value is not None:
+                self._cache.move_to_end(text)
+                return value
+        value = self._scan(text) if self.may_have_typo(text) else ()
+        with self._lock:
+            self._cache[text] = value
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+
+def _new_tokenizer():
+    import jieba
+
+    jieba.setLogLevel(logging.WARNING)
+    tokenizer = jieba.Tokenizer()
+    tokenizer.initialize()
+    return tokenizer
+
+
+def _preload(reference):
+    global _jieba_loaded, _spare_tokenizer
+    try:
+        _spare_tokenizer = _new_tokenizer()
+        _jieba_loaded = True
+        logging.info("jieba 词典已加载")
+    except Exception as e:
+        logging.error(f"jieba 词典加载失败，备注词级错别字检测不可用：{e}")
+    finally:
+        _tokenizer_ready.set()
+    if reference is not None and _jieba_loaded:
+        get_word_typo_detector(reference)
+
+
+def start_jieba_preload(reference=None):
+    """
+    启动后台线程加载 jieba 词典（每个进程只加载一次，重复调用无副作用）；
+    传入 reference 时加载完成后接着为该版本的参考数据构建检测器。
+    """
+    global _preload_thread
+    with _preload_lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(target=_preload, args=(reference,), name='jieba-preload', daemon=True)
+            _preload_thread.start()
+        return _preload_thread
+
+
+def _build_detector(reference):
+    """用新的 jieba 分词器（加入本版本的已知词作为用户词典）构建检测器"""
+    global _spare_tokenizer
+    tokenizer = _spare_tokenizer if _spare_tokenizer is not None else _new_tokenizer()
+    _spare_tokenizer = None
+    words = set(reference.major_index.levels_by_name) | set(CUSTOM_WHITELIST)
+    for word in words:
+        if not tokenizer.FREQ.get(word):
+            tokenizer.add_word(word, freq=USER_WORD_FREQ)
+    detector = WordTypoDetector(tokenizer, words)
+    logging.info(f"备注词级错别字检测已就绪（已知词 {len(detector.words)} 个，参考数据版本 {reference.version}）")
+    return detector
+
+
+def get_word_typo_detector(reference):
+    """
+    reference 版本和当前 CUSTOM_WHITELIST 对应的检测器，最近 DETECTOR_CACHE_SIZE 个版本的检测器直接复用。
+    没有时用新的分词器构建，已有的检测器及其分词器不再修改，正在使用它们的线程不受影响，分词结果也不依赖以往加载过的版本；
+    jieba 尚未加载完成时等待加载，加载失败时返回 None。一次处理任务只应获取一次，传给各数据块。
+    """
+    start_jieba_preload()
+    _tokenizer_ready.wait()
+    if not _jieba_loaded:
+        return None
+    key = (reference.version, frozenset(CUSTOM_WHITELIST))
+    with _detector_lock:
+        detector = _detectors.get(key)
+        if detector is not None:
+            _detectors.move_to_end(key)
+            return detector
+    with _build_lock:
+        # 等待期间其他线程可能已构建好
+        with _detector_lock:
+            detector = _detectors.get(key)
+        if detector is None:
+            detector = _build_detector(reference)
+        with _detector_lock:
+            _detectors[key] = detector
+            _detectors.move_to_end(key)
+            while len(_detectors) > DETECTOR_CACHE_SIZE:
+                _detectors.popitem(last=False)
+    return detector
+
+
+def warm_word_typo_detector(reference):
+    """
+    预先构建 reference 版本的检测器（参考数据热更新后由监控线程调用，新任务不必等待构建）；
+    本进程没有启动过 jieba 预加载（不做词级检测）时不构建。
+    """
+    if _preload_thread is None:
+        return
+    get_word_typo_detector(reference)
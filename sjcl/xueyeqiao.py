@@ -0,0 +1,1039 @@
+"""
+学业桥数据处理：校对学校名称、招生专业、专业备注、分数，转换选科要求/首选科目/专业组代码，
+并按学业桥导出格式生成 Excel。
+"""
+import os
+import re
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from .aliases import get_school_alias_index
+from .factorize import map_unique
+from .indexes import BigramIndex, BKTree, MajorIndex, PrefixTrie, normalize_major_brackets, split_major_combo
+from .pool import (get_process_pool, process_pool_supported, process_pool_workers, shutdown_process_pool,
+                   submit_chunk)
+from .reference_data import diff_reference_versions, get_reference_data, load_reference_version
+from .remark_clusters import suggest_canonical_remarks
+from .remarks import (CUSTOM_WHITELIST, analyze_and_fix_cached, check_remark_dictionaries, remark_cache_stats,
+                      remark_dictionaries_digest, remark_prescreen)
+from .row_cache import ROW_CACHE_FORMAT, RowResultCache, fingerprint_rows
+from .word_typos import get_word_typo_detector
+
+
+def check_school_name(name, valid_names=None):
+    if pd.isna(name) or not str(name).strip():
+        return '学校名称为空'
+    if valid_names is None:
+        valid_names = get_reference_data().school_names
+    return '匹配' if name.strip() in valid_names else '不匹配'
+
+
+def check_major_combo(major, level, valid_combos=None):
+    if pd.isna(major) or pd.isna(level):
+        return "数据缺失"
+    if valid_combos is None:
+        valid_combos = get_reference_data().major_combos
+    combo = f"{str(major).strip()}{str(level).strip()}"
+    return "匹配" if combo in valid_combos else "不匹配"
+
+
+def check_school_names(names, valid_names):
+    """check_school_name 的列向量版本：返回与 names 同索引的 学校名称为空 / 匹配 / 不匹配"""
+    stripped = names.astype(str).str.strip()
+    empty = names.isna() | (stripped == '')
+    matched = stripped.isin(valid_names)
+    return pd.Series(np.where(empty, '学校名称为空', np.where(matched, '匹配', '不匹配')),
+                     index=names.index, dtype=object)
+
+
+def check_major_combos(majors, levels, valid_combos):
+    """check_major_combo 的列向量版本：返回与 majors 同索引的 数据缺失 / 匹配 / 不匹配"""
+    missing = majors.isna() | levels.isna()
+    combos = majors.astype(str).str.strip() + levels.astype(str).str.strip()
+    matched = combos.isin(valid_combos)
+    return pd.Series(np.where(missing, '数据缺失', np.where(matched, '匹配', '不匹配')),
+                     index=majors.index, dtype=object)
+
+
+def resolve_school_aliases(originals, results, reference, aliases=None):
+    """
+    学校匹配结果为"不匹配"的行，用院校原始名称查别名索引（O(1)），
+    得到当前参考数据中有效的官方名称则返回该名称，其余行为空。
+    """
+    if aliases is None:
+        aliases = get_school_alias_index()
+    unmatched = originals[results == '不匹配'].astype(str).str.strip()
+    resolved = {}
+    for original in unmatched.unique():
+        canonical = aliases.resolve(original)
+        resolved[original] = canonical if canonical in reference.school_names else ''
+    return unmatched.map(resolved).reindex(originals.index, fill_value='')
+
+
+# 不匹配的学校名称给出的建议名称个数
+SCHOOL_SUGGESTION_COUNT = 3
+
+
+def suggest_school_names(names, results, reference, k=SCHOOL_SUGGESTION_COUNT):
+    """
+    为学校匹配结果为"不匹配"的行给出最相近的官方学校名称（用"；"连接），其余行为空。
+    同一名称只查询一次索引。
+    """
+    index = reference.school_index
+    unmatched = names[results == '不匹配'].astype(str).str.strip()
+    suggestions = {name: '；'.join(n for n, _ in index.suggest(name, k)) for name in unmatched.unique()}
+    return unmatched.map(suggestions).reindex(names.index, fill_value='')
+
+
+# 专业后缀正则及其对应的白名单：(frozenset(CUSTOM_WHITELIST), 正则)
+_major_suffix_cache = (None, None)
+
+
+def major_suffix_pattern():
+    """
+    专业名称有效前缀之后允许的后缀：括号内容（如 （中外合作办学））或白名单中的办学形式、校区（如 珠海校区）。
+    按当前 CUSTOM_WHITELIST 生成，白名单修改后自动重建。
+    """
+    global _major_suffix_cache
+    whitelist = frozenset(CUSTOM_WHITELIST)
+    cached_whitelist, pattern = _major_suffix_cache
+    if cached_whitelist != whitelist:
+        pattern = re.compile(
+            r'(?:（[^（）]*）|' + '|'.join(re.escape(w) for w in sorted(whitelist, key=len, reverse=True)) + r')*')
+        _major_suffix_cache = (whitelist, pattern)
+    return pattern
+
+
+def match_major_prefixes(majors, levels, results, reference):
+    """
+    第二遍匹配：招生专业匹配结果为"不匹配"的行，括号统一后在前缀树中找最长的有效专业名称
+    （剩余部分须为括号内容或白名单后缀，且该专业有此层次），返回匹配到的专业名称，其余行为空。
+    同一 (专业, 层次) 只查一次前缀树，不逐行扫描整个专业目录。
+    """
+    index = reference.major_index
+    mask = results == '不匹配'
+    keys = pd.Series(list(zip(majors[mask].astype(str).str.strip(), levels[mask].astype(str).str.strip())),
+                     index=majors.index[mask], dtype=object)
+    suffix_pattern = major_suffix_pattern()
+    bases = {key: index.match_prefix(key[0], key[1], suffix_pattern) for key in keys.unique()}
+    return keys.map(bases).reindex(majors.index, fill_value='')
+
+
+# 招生专业不匹配时给出的建议个数
+MAJOR_SUGGESTION_COUNT = 3
+
+
+def diagnose_major_combos(majors, levels, results, reference, k=MAJOR_SUGGESTION_COUNT):
+    """
+    对招生专业匹配结果为"不匹配"的行给出原因（专业名称为空 / 层次不符 / 专业名称不存在）和最相近的有效"专业名称+层次"，
+    返回 (原因列, 建议列)，其余行为空。同一 (专业, 层次) 只诊断一次。
+    """
+    index = reference.major_index
+    mask = results == '不匹配'
+    keys = pd.Series(list(zip(majors[mask].astype(str).str.strip(), levels[mask].astype(str).str.strip())),
+                     index=majors.index[mask], dtype=object)
+    diagnoses = {key: index.diagnose(key[0], key[1], k) for key in keys.unique()}
+    reasons = keys.map(lambda key: diagnoses[key][0]).reindex(majors.index, fill_value='')
+    suggestions = keys.map(lambda key: '；'.join(diagnoses[key][1])).reindex(majors.index, fill_value='')
+    return reasons, suggestions
+
+
+def convert_selection_requirement_from_requirement(req):
+    """
+    依据上传文件中的报考要求转换为选科要求说明与次选科目（与 docx 规范一致）。
+    1. 报考要求：不限 → 选科要求说明：不限科目专业组，次选科目：空白
+    2. 报考要求仅为单个字（如"化""政"）→ 选科要求说明：单科、多科均需选考，次选科目=报考要求
+    3. 报考要求中包含"且"（如"物且化"、"物且化且生"）→ 选科要求说明：单科、多科均需选考，次选科目为去掉"且"
+    4. 报考要求中包含"或"（如"物或化"、"物或化或生"）→ 选科要求说明：多门选考，次选科目为去掉"或"
+    """
+    if pd.isna(req) or not str(req).strip():
+        return "不限科目专业组", ""
+    s = str(req).strip()
+    if "不限" in s:
+        return "不限科目专业组", ""
+    if len(s) == 1:
+        return "单科、多科均需选考", s
+    if "且" in s:
+        return "单科、多科均需选考", s.replace("且", "")
+    if "或" in s:
+        return "多门选考", s.replace("或", "")
+    return "", ""
+
+
+def _to_text(value):
+    """转换为文本格式（学业桥工具用）"""
+    if value is None or (value != 0 and not value):
+        return ''
+    text = str(value).lstrip('^').strip().lstrip("'")
+    return text
+
+
+def _get_first_subject(category):
+    """根据科类取首选科目（学业桥工具用）"""
+    if not category:
+        return ''
+    c = str(category)
+    if '物理类' in c or '物理' in c:
+        return '物'
+    if '历史类' in c or '历史' in c:
+        return '历'
+    return ''
+
+
+def _normalize_kele(kele):
+    """转换招生科类：物理→物理类，历史→历史类，其他科类直接返回。"""
+    if kele is None or (isinstance(kele, str) and not kele.strip()):
+        return ''
+    k = str(kele).strip()
+    if k == '物理':
+        return '物理类'
+    if k == '历史':
+        return '历史类'
+    return k
+
+
+# ==================== 专业组代码按省份转换 ====================
+# 转换规则：规则名 → 按列转换函数 (招生代码, 专业组编号) → 专业组代码（参数为 object 类型的 Series）
+GROUP_CODE_RULES = {
+    '无专业组': lambda code, group: '',
+    '招生代码+专业组编号': lambda code, group: code + group,               # 如 320401、0200001
+    '招生代码=专业组代码': lambda code, group: code,                       # 如 320401
+    '招生代码+（专业组编号）': lambda code, group: code.where(group == '', code + '（' + group + '）'),  # 如 3204（01）
+}
+
+# 省份 → 转换规则；表中没有的省份使用 GROUP_CODE_DEFAULT_RULE。新增省份只需修改此表
+GROUP_CODE_PROVINCE_RULES = {
+    '河北': '无专业组', '辽宁': '无专业组', '山东': '无专业组', '浙江': '无专业组', '重庆': '无专业组',
+    '贵州': '无专业组', '青海': '无专业组', '新疆': '无专业组', '西藏': '无专业组',
+    '吉林': '招生代码+专业组编号',
+    '湖北': '招生代码=专业组代码', '江苏': '招生代码=专业组代码', '上海': '招生代码=专业组代码',
+    '海南': '招生代码=专业组代码', '天津': '招生代码=专业组代码',
+}
+GROUP_CODE_DEFAULT_RULE = '招生代码+（专业组编号）'
+
+
+def convert_group_codes(provinces, codes, groups):
+    """
+    按省份整列转换专业组代码：省份经 GROUP_CODE_PROVINCE_RULES 查到转换规则，
+    每种规则对其所有行做一次按列字符串运算。参数为等长的序列（Series、数组或列表），空值、0 等假值按空字符串处理。
+    """
+    # 省份、招生代码、专业组编号的不同取值远少于行数，查规则和转文本都只对不同取值做一次
+    rules = map_unique(
+        lambda p: GROUP_CODE_PROVINCE_RULES.get(str(p or '').strip(), GROUP_CODE_DEFAULT_RULE), provinces)
+    code = pd.Series(map_unique(lambda v: _to_text(v or ''), codes), dtype=object)
+    group = pd.Series(map_unique(lambda v: _to_text(v or ''), groups), dtype=object)
+    result = np.empty(len(rules), dtype=object)
+    for rule in pd.unique(rules):
+        mask = rules == rule
+        converted = GROUP_CODE_RULES[rule](code[mask], group[mask])
+        result[mask] = converted.to_numpy(dtype=object) if isinstance(converted, pd.Series) else converted
+    return result
+
+
+def _convert_group_code_by_province(province, zhaosheng_code, group_no):
+    """按省份转换单行的专业组代码（规则见 GROUP_CODE_PROVINCE_RULES）"""
+    return convert_group_codes([province], [zhaosheng_code], [group_no])[0]
+
+
+# 学业桥上传文件从第一行（标题行）开始校验，必须包含以下字段
+XUEYEQIAO_UPLOAD_COLUMNS = [
+    '数据类型', '年份', '省份', '批次', '科类', '院校名称', '院校原始名称', '招生代码', '专业组编号',
+    '专业代码', '招生类型', '专业名称', '报考要求', '专业备注', '招生计划人数', '最低分', '最低位次',
+    '最高分', '平均分', '录取人数'
+]
+
+# 学业桥导出文件第3行标题列（与上传字段映射后的导出格式）
+XUEYEQIAO_EXPORT_HEADERS = [
+    '学校名称', '省份', '招生专业', '专业方向（选填）', '专业备注（选填）', '一级层次', '招生科类', '招生批次',
+    '招生类型（选填）', '最高分', '最低分', '平均分', '最低分位次（选填）', '招生人数（选填）', '数据来源',
+    '专业组代码', '首选科目', '选科要求', '次选科目', '专业代码', '招生代码',
+    '最低分数区间低', '最低分数区间高', '最低分数区间位次低', '最低分数区间位次高', '录取人数（选填）',
+    '修改后备注', '备注修改说明', '学校别名解析', '学校名称建议', '招生专业前缀匹配', '招生专业不匹配原因', '招生专业建议',
+    '备注规范建议'
+]
+
+# 学业桥导出文件第1行合并单元格备注内容（A1-U1，行高220磅）
+XUEYEQIAO_EXPORT_NOTE = (
+    '备注：请删除示例后再填写；\n'
+    '1.省份：必须填写各省份简称，例如：北京、内蒙古，不能带有市、省、自治区、空格、特殊字符等\n'
+    '2.科类：浙江、上海限定"综合、艺术类、体育类"，内蒙古限定"文科、理科、蒙授文科、蒙授理科、艺术类、艺术文、艺术理、体育类、体育文、体育理、蒙授艺术、蒙授体育"，其他省份限定"文科、理科、艺术类、艺术文、艺术理、体育类、体育文、体育理"\n'
+    '3.批次：（以下为19年使用批次）\n'
+    '河北、内蒙古、吉林、江苏、安徽、福建、江西、河南、湖北、广西、重庆、四川、贵州、云南、西藏、陕西、甘肃、宁夏、新疆限定本科提前批、本科一批、本科二批、专科提前批、专科批、国家专项计划本科批、地方专项计划本科批；\n'
+    '黑龙江、湖南、青海限定本科提前批、本科一批、本科二批、本科三批、专科提前批、专科批、国家专项计划本科批、地方专项计划本科批；\n'
+    '山西限定本科一批A段、本科一批B段、本科二批A段、本科二批B段、本科二批C段、专科批、国家专项计划本科批、地方专项计划本科批；\n'
+    '浙江限定普通类提前批、平行录取一段、平行录取二段、平行录取三段\n'
+    '4.招生人数：仅能填写数字\n'
+    '5.最高分、最低分、平均分：仅能填写数字，保留小数后两位，且三者顺序不能改变，最低分为必填项，其中艺术类和体育类分数为文化课分数\n'
+    '6.一级层次：限定"本科、专科（高职）"，该部分为招生专业对应的专业层次\n'
+    '7.最低分位次：仅能填写数字;\n'
+    '8.数据来源：必须限定——官方考试院、大红本数据、学校官网、销售、抓取、圣达信、优志愿、学业桥\n'
+    '9.选科要求：不限科目专业组;多门选考;单科、多科均需选考\n'
+    '10.选科科目必须是科目的简写（物、化、生、历、地、政、技）\n'
+    '11.2020北京、海南，17-19上海仅限制本科专业组代码必填\n'
+    '12.新八省首选科目必须选择（物理或历史）\n'
+    '13.分数区间仅限北京'
+)
+
+# 导出文件中的隐藏工作表：记录校验时的参考数据版本和每行的匹配结果，供重新校验使用
+RESULT_SHEET = '校验信息'
+RESULT_COLUMNS = ['学校匹配结果', '招生专业匹配结果']
+
+
+def map_upload_row_to_export(row):
+    """
+    将上传文件的一行映射为导出文件格式。
+    字段映射：学校名称←院校名称，招生专业←专业名称，招生科类←科类，专业组代码←专业组编号等；
+    首选科目由科类经 _get_first_subject 得到；选科要求、次选科目由报考要求经 convert_selection_requirement_from_requirement 转换。
+    """
+    new_row = {}
+    new_row['学校名称'] = row.get('院校名称', '') or ''
+    new_row['省份'] = row.get('省份', '') or ''
+    new_row['招生专业'] = row.get('专业名称', '') or ''
+    new_row['专业方向（选填）'] = row.get('专业方向（选填）', '') or ''
+    new_row['专业备注（选填）'] = row.get('专业备注', '') or ''
+    new_row['一级层次'] = row.get('一级层次', '') or ''
+    # 招生科类：物理→物理类，历史→历史类，其他直接转换
+    kele_raw = row.get('科类', '') or ''
+    new_row['招生科类'] = _normalize_kele(kele_raw)
+    new_row['招生批次'] = row.get('批次', '') or ''
+    new_row['招生类型（选填）'] = row.get('招生类型', '') or ''
+    new_row['最高分'] = row.get('最高分', '') or ''
+    new_row['最低分'] = row.get('最低分', '') or ''
+    new_row['平均分'] = row.get('平均分', '') or ''
+    new_row['最低分位次（选填）'] = row.get('最低位次', '') or ''
+    new_row['招生人数（选填）'] = row.get('招生计划人数', '') or ''
+    new_row['数据来源'] = row.get('数据来源', '') or ''
+    # 专业组代码按省份转换
+    province = row.get('省份', '') or ''
+    zhaosheng_code = row.get('招生代码', '') or ''
+    group_no = row.get('专业组编号', '') or row.get('专业组代码', '')
+    new_row['专业组代码'] = _convert_group_code_by_province(province, zhaosheng_code, group_no)
+    cat = row.get('科类', '') or ''
+    new_row['首选科目'] = _get_first_subject(cat)
+    req = row.get('报考要求', '') or ''
+    sel_desc, second = convert_selection_requirement_from_requirement(req)
+    new_row['选科要求'] = sel_desc
+    new_row['次选科目'] = second
+    new_row['专业代码'] = _to_text(row.get('专业代码', ''))
+    new_row['招生代码'] = _to_text(row.get('招生代码', ''))
+    new_row['最低分数区间低'] = row.get('最低分数区间低', '') or ''
+    new_row['最低分数区间高'] = row.get('最低分数区间高', '') or ''
+    new_row['最低分数区间位次低'] = row.get('最低分数区间位次低', '') or ''
+    new_row['最低分数区间位次高'] = row.get('最低分数区间位次高', '') or ''
+    new_row['录取人数（选填）'] = row.get('录取人数', '') or ''
+    # 修改后备注和备注修改说明放在模板列之后
+    new_row['修改后备注'] = row.get('修改后备注', '') or ''
+    new_row['备注修改说明'] = row.get('备注检查结果', '') or ''
+    # 学校名称不匹配时：由院校原始名称别名解析出的官方名称，或模糊搜索得到的建议名称
+    new_row['学校别名解析'] = row.get('学校别名解析', '') or ''
+    new_row['学校名称建议'] = row.get('学校名称建议', '') or ''
+    # 带括号后缀、按最长有效前缀匹配上的专业名称
+    new_row['招生专业前缀匹配'] = row.get('招生专业前缀匹配', '') or ''
+    # 招生专业不匹配时的原因（专业名称为空 / 层次不符 / 专业名称不存在）和建议的有效专业
+    new_row['招生专业不匹配原因'] = row.get('招生专业不匹配原因', '') or ''
+    new_row['招生专业建议'] = row.get('招生专业建议', '') or ''
+    # 同一学校、省份内与其他备注近似重复时的规范写法
+    new_row['备注规范建议'] = row.get('备注规范建议', '') or ''
+    return new_row
+
+
+# ==================== 按列映射导出格式 ====================
+# 导出列 ← 上传列（直接取值，值为空、0 等假值时为空字符串）
+EXPORT_COLUMN_SOURCES = {
+    '学校名称': '院校名称', '省份': '省份', '招生专业': '专业名称', '专业方向（选填）': '专业方向（选填）',
+    '专业备注（选填）': '专业备注', '一级层次': '一级层次', '招生批次': '批次', '招生类型（选填）': '招生类型',
+    '最高分': '最高分', '最低分': '最低分', '平均分': '平均分', '最低分位次（选填）': '最低位次',
+    '招生人数（选填）': '招生计划人数', '数据来源': '数据来源',
+    '最低分数区间低': '最低分数区间低', '最低分数区间高': '最低分数区间高',
+    '最低分数区间位次低': '最低分数区间位次低', '最低分数区间位次高': '最低分数区间位次高',
+    '录取人数（选填）': '录取人数', '修改后备注': '修改后备注', '备注修改说明': '备注检查结果',
+    '学校别名解析': '学校别名解析', '学校名称建议': '学校名称建议', '招生专业前缀匹配': '招生专业前缀匹配',
+    '招生专业不匹配原因': '招生专业不匹配原因', '招生专业建议': '招生专业建议', '备注规范建议': '备注规范建议',
+}
+
+
+def _column_values(df, col):
+    """取列的 object 数组（与 row.to_dict() 得到的值相同），缺列时为空字符串"""
+    if col not in df.columns:
+        return np.full(len(df), '', dtype=object)
+    return df[col].to_numpy(dtype=object)
+
+
+def _str_series(values):
+    """逐个 str()（与逐行代码一致，NaN 转为 'nan'），返回 object 列，便于使用 .str 方法"""
+    return pd.Series([str(v) for v in values], dtype=object)
+
+
+def _or_empty(values):
+    """按 Python 真值判断的 `value or ''`"""
+    return np.where(values.astype(bool), values, '')
+
+
+def _to_text_column(values):
+    """_to_text 的列向量版本"""
+    empty = ~values.astype(bool) & ~(values == 0)
+    text = _str_series(values).str.lstrip('^').str.strip().str.lstrip("'")
+    return np.where(empty, '', text.to_numpy(dtype=object))
+
+
+def _normalize_kele_column(values):
+    """_normalize_kele 的列向量版本"""
+    text = _str_series(values).str.strip()
+    return text.replace({'物理': '物理类', '历史': '历史类'}).to_numpy(dtype=object)
+
+
+def _first_subject_column(values):
+    """_get_first_subject 的列向量版本"""
+    text = _str_series(values)
+    return np.select([text.str.contains('物理', regex=False), text.str.contains('历史', regex=False)],
+                     ['物', '历'], '').astype(object)
+
+
+def _selection_requirement_columns(values):
+    """convert_selection_requirement_from_requirement 的列向量版本，返回 (选科要求, 次选科目)"""
+    text = _str_series(values).str.strip()
+    blank = pd.isna(values) | (text == '')
+    unlimited = blank | text.str.contains('不限', regex=False)
+    single = text.str.len() == 1
+    both = text.str.contains('且', regex=False)
+    either = text.str.contains('或', regex=False)
+    conditions = [unlimited, single, both, either]
+    desc = np.select(conditions, ['不限科目专业组', '单科、多科均需选考', '单科、多科均需选考', '多门选考'], '')
+    second = np.select(conditions, ['', text, text.str.replace('且', '', regex=False),
+                                    text.str.replace('或', '', regex=False)], '')
+    return desc.astype(object), second.astype(object)
+
+
+def build_export_frame(df):
+    """
+    map_upload_row_to_export 的按列版本：由处理后的 DataFrame 直接生成 XUEYEQIAO_EXPORT_HEADERS 各列，
+    结果与逐行映射完全一致。
+    """
+    columns = {header: _or_empty(_column_values(df, source)) for header, source in EXPORT_COLUMN_SOURCES.items()}
+    kele = _or_empty(_column_values(df, '科类'))
+    columns['招生科类'] = _normalize_kele_column(kele)
+    columns['首选科目'] = _first_subject_column(kele)
+    group_no = _or_empty(_column_values(df, '专业组编号'))
+    group_no = np.where(group_no.astype(bool), group_no, _column_values(df, '专业组代码'))
+    columns['专业组代码'] = convert_group_codes(_column_values(df, '省份'), _column_values(df, '招生代码'), group_no)
+    columns['选科要求'], columns['次选科目'] = _selection_requirement_columns(_or_empty(_column_values(df, '报考要求')))
+    columns['专业代码'] = _to_text_column(_column_values(df, '专业代码'))
+    columns['招生代码'] = _to_text_column(_column_values(df, '招生代码'))
+    return pd.DataFrame({header: columns[header] for header in XUEYEQIAO_EXPORT_HEADERS}, index=df.index)
+
+
+def check_score_consistency(row):
+    """检查分数一致性：最高分 >= 平均分 >= 最低分"""
+    issues = []
+    try:
+        max_score = float(row['最高分']) if pd.notna(row['最高分']) else None
+        avg_score = float(row['平均分']) if pd.notna(row['平均分']) else None
+        min_score = float(row['最低分']) if pd.notna(row['最低分']) else None
+
+        if max_score is not None and avg_score is not None and max_score < avg_score:
+            issues.append(f"最高分({max_score}) < 平均分({avg_score})")
+
+        if max_score is not None and min_score is not None and max_score < min_score:
+            issues.append(f"最高分({max_score}) < 最低分({min_score})")
+
+        if avg_score is not None and min_score is not None and avg_score < min_score:
+            issues.append(f"平均分({avg_score}) < 最低分({min_score})")
+
+    except (ValueError, TypeError) as e:
+        issues.append(f"分数格式错误: {str(e)}")
+
+    return '；'.join(issues) if issues else '无问题'
+
+
+def _check_schools(chunk, school_col, reference):
+    """写入 学校匹配结果、学校别名解析（有院校原始名称列时）、学校名称建议"""
+    chunk['学校匹配结果'] = check_school_names(chunk[school_col], reference.school_names)
+    # 先用院校原始名称查别名，解析成功的行不再做模糊搜索
+    pending = chunk['学校匹配结果']
+    if '院校原始名称' in chunk.columns:
+        chunk['学校别名解析'] = resolve_school_aliases(chunk['院校原始名称'], chunk['学校匹配结果'], reference)
+        pending = pending.where(chunk['学校别名解析'] == '', '别名解析')
+    chunk['学校名称建议'] = suggest_school_names(chunk[school_col], pending, reference)
+
+
+def _check_majors(chunk, major_col, reference):
+    """写入 招生专业匹配结果、招生专业前缀匹配、招生专业不匹配原因、招生专业建议"""
+    chunk['招生专业匹配结果'] = check_major_combos(chunk[major_col], chunk['一级层次'], reference.major_combos)
+    # 带括号后缀的专业按最长有效前缀再匹配一次，匹配上的不再列为不匹配
+    chunk['招生专业前缀匹配'] = match_major_prefixes(
+        chunk[major_col], chunk['一级层次'], chunk['招生专业匹配结果'], reference)
+    chunk['招生专业匹配结果'] = chunk['招生专业匹配结果'].where(chunk['招生专业前缀匹配'] == '', '匹配')
+    chunk['招生专业不匹配原因'], chunk['招生专业建议'] = diagnose_major_combos(
+        chunk[major_col], chunk['一级层次'], chunk['招生专业匹配结果'], reference)
+
+
+def process_chunk(chunk, reference=None, detector=None, counts=None):
+    """
+    处理数据块。支持上传文件列名与导出列名并存：
+    学校名称/院校名称、招生专业/专业名称、招生科类/科类、选科要求/报考要求。
+    选科转换逻辑与 docx 一致：不限/单字/且/或 → 选科要求说明、次选。
+    reference 为本次任务使用的参考数据版本，未传入时取当前版本；
+    detector 为本次任务的词级错别字检测器（由任务开始时获取后传给各数据块），未传入时按 reference 获取。
+    传入 counts（dict）时写入 非空备注、备注预筛直接通过 的行数，供汇总统计。
+    """
+    if reference is None:
+        reference = get_reference_data()
+
+    # 学校名称检查（支持 学校名称 或 院校名称）
+    school_col = '学校名称' if '学校名称' in chunk.columns else ('院校名称' if '院校名称' in chunk.columns else None)
+    if school_col:
+        _check_schools(chunk, school_col, reference)
+
+    # 专业匹配检查（支持 招生专业 或 专业名称，需有一级层次）
+    major_col = '招生专业' if '招生专业' in chunk.columns else ('专业名称' if '专业名称' in chunk.columns else None)
+    if major_col and '一级层次' in chunk.columns:
+        _check_majors(chunk, major_col, reference)
+
+    # 备注处理（支持 专业备注）
+    remark_col = None
+    for c in chunk.columns:
+        if '专业备注' in str(c):
+            remark_col = c
+            break
+    if remark_col is not None:
+        check_remark_dictionaries()
+        remarks = chunk[remark_col]
+        # 预筛未命中的备注 analyze_and_fix 会原样返回，不做完整检查；只有可能需要修改的备注做完整检查
+        need_check, blank = remark_prescreen(remarks)
+        checked = {remark: analyze_and_fix_cached(remark) for remark in remarks[need_check].unique()}
+        # 词级错别字检测对所有非空备注的修正后文本做（TYPO_DICT 预筛未命中的备注同样可能有未列举的错别字），
+        # 先做不分词的预筛，未命中的备注不经过 jieba；两个预筛都未命中的备注直接判为无问题
+        if detector is None:
+            detector = get_word_typo_detector(reference)
+        messages = {}
+        passed = {}
+        for remark in remarks[~blank].unique():
+            fixed, issues = checked.get(remark, (remark, ()))
+            passed[remark] = remark not in checked and (detector is None or not detector.may_have_typo(str(remark)))
+            if detector is not None and not passed[remark]:
+                issues = tuple(issues) + detector.detect(str(fixed))
+            messages[remark] = '；'.join(issues) or '无问题'
+        chunk['备注检查结果'] = remarks[~blank].map(messages).reindex(chunk.index, fill_value='无问题')
+        if counts is not None:
+            counts['非空备注'] = int((~blank).sum())
+            counts['备注预筛直接通过'] = int(remarks[~blank].map(passed).sum())
+        chunk['修改后备注'] = remarks.astype(str).where(~blank, '').astype(object)
+        chunk.loc[need_check, '修改后备注'] = remarks[need_check].map(lambda r: checked[r][0])
+
+    # 分数检查
+    score_columns = ['最高分', '平均分', '最低分']
+    if all(col in chunk.columns for col in score_columns):
+        chunk['分数检查结果'] = map_unique(
+            lambda mx, avg, mn: check_score_consistency({'最高分': mx, '平均分': avg, '最低分': mn}),
+            *(chunk[col] for col in score_columns))
+
+    # 选科要求处理：依据 docx，支持 选科要求 或 报考要求，统一用 convert_selection_requirement_from_requirement
+    req_col = '选科要求' if '选科要求' in chunk.columns else ('报考要求' if '报考要求' in chunk.columns else None)
+    if req_col:
+        chunk['选科要求说明'], chunk['次选'] = map_unique(
+            convert_selection_requirement_from_requirement, chunk[req_col], n_outputs=2)
+
+    # 招生科类处理（支持 招生科类 或 科类），统一为物理类/历史类并生成首选科目
+    cat_col = '招生科类' if '招生科类' in chunk.columns else ('科类' if '科类' in chunk.columns else None)
+    if cat_col:
+        chunk['招生科类'] = chunk[cat_col].replace({'物理': '物理类', '历史': '历史类'})
+        chunk['首选科目'] = map_unique(
+            lambda x: _get_first_subject(x) if pd.notna(x) and str(x).strip() else '', chunk['招生科类'])
+    elif '首选科目' not in chunk.columns and req_col:
+        chunk['首选科目'] = ''
+
+    return chunk
+
+
+# process_chunk 读取的输入列（含各列的候选列名，另加名称含"专业备注"的列）；这些列都相同的行处理结果相同
+PROCESS_CHUNK_INPUT_COLUMNS = (
+    '学校名称', '院校名称', '院校原始名称', '招生专业', '专业名称', '一级层次', '最高分', '平均分', '最低分',
+    '选科要求', '报考要求', '招生科类', '科类',
+)
+
+
+def process_chunk_input_columns(df):
+    """df 中 process_chunk 会读取的列（按 df 的列顺序）"""
+    return [col for col in df.columns if col in PROCESS_CHUNK_INPUT_COLUMNS or '专业备注' in str(col)]
+
+
+def _find_remark_column(df):
+    """在 DataFrame 中查找专业备注相关列（上传多为“专业备注”，新文件多为“专业备注（选填）”）"""
+    for col in df.columns:
+        c = str(col).strip() if col is not None else ""
+        if not c:
+            continue
+        if c in ("专业备注", "专业备注（选填）") or "专业备注" in c:
+            return col
+    return None
+
+
+# ==================== 数据块划分 ====================
+# 每行的估计开销 = CHUNK_ROW_COST + 需要完整检查的备注长度（以备注字符数为单位；学校/专业校验约相当于 20 个字符）
+CHUNK_ROW_COST = 20
+# 每块的行数范围：小于下限的块调度开销占比过高，大于上限的块拖慢进度显示和尾部均衡
+CHUNK_MIN_ROWS = 200
+CHUNK_MAX_ROWS = 5000
+# 每块取剩余开销的 1 / (CHUNK_GUIDED_FACTOR × 工作进程数)：块从大到小，最后的小块由先空闲的进程领取
+CHUNK_GUIDED_FACTOR = 2
+
+
+def estimate_row_costs(df, need_check=None):
+    """
+    每行的估计处理开销：预筛命中的备注（需要完整检查）按长度计入，其余行只计固定开销。
+    need_check 为已算好的预筛结果（与 df 逐行对应），未传入时重新预筛。
+    """
+    costs = np.full(len(df), CHUNK_ROW_COST, dtype=np.int64)
+    remark_col = _find_remark_column(df)
+    if remark_col is not None:
+        if need_check is None:
+            need_check, _ = remark_prescreen(df[remark_col])
+        lengths = df[remark_col].astype(str).str.len().fillna(0).to_numpy(dtype=np.int64)
+        costs += np.where(np.asarray(need_check), lengths, 0)
+    return costs
+
+
+def plan_chunks(costs, workers):
+    """
+    按估计开销划分数据块，返回 [(起始行, 结束行)]。
+    每块取剩余开销的 1 / (CHUNK_GUIDED_FACTOR × workers)，行数限制在 CHUNK_MIN_ROWS ~ CHUNK_MAX_ROWS：
+    文件小时块少（不足 CHUNK_MIN_ROWS 行只有一块），文件大时前面的块大、后面的块越来越小。
+    """
+    total_rows = len(costs)
+    cumulative = np.cumsum(costs)
+    bounds = []
+    start = 0
+    while start < total_rows:
+        done = cumulative[start - 1] if start else 0
+        target = (cumulative[-1] - done) / (CHUNK_GUIDED_FACTOR * max(1, workers))
+        stop = int(np.searchsorted(cumulative, done + target)) + 1
+        stop = min(max(stop, start + CHUNK_MIN_ROWS), start + CHUNK_MAX_ROWS, total_rows)
+        if total_rows - stop < CHUNK_MIN_ROWS:
+            # 剩余不足一块的行并入本块
+            stop = total_rows
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def process_chunk_columns(chunk, reference=None, detector=None, counts=None):
+    """process_chunk 新增的列：{列名: 数组}（按添加顺序，保持原列类型），数据块本身的列不返回"""
+    input_columns = set(chunk.columns)
+    result = process_chunk(chunk, reference, detector, counts)
+    return {col: result[col].array for col in result.columns if col not in input_columns}
+
+
+def _timed_process_chunk(chunk, reference, detector):
+    start = time.perf_counter()
+    counts = {}
+    columns = process_chunk_columns(chunk, reference, detector, counts)
+    return columns, time.perf_counter() - start, counts
+
+
+def _run_chunks_in_threads(chunks, reference, detector, progress_callback=None):
+    """线程池处理各数据块（空闲线程依次领取下一块），按原顺序返回 (各块新增的列, 各块耗时, 各块备注计数)"""
+    results = {}
+    total_chunks = len(chunks)
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+        future_to_index = {executor.submit(_timed_process_chunk, chunk, reference, detector): idx
+                           for idx, chunk in enumerate(chunks)}
+        for count, future in enumerate(as_completed(future_to_index)):
+            idx = future_to_index[future]
+            results[idx] = future.result()
+            if progress_callback:
+                progress_callback(count + 1, total_chunks)
+    ordered = [results[i] for i in sorted(results.keys())]
+    return [result for result, _, _ in ordered], [seconds for _, seconds, _ in ordered], [counts for _, _, counts in ordered]
+
+
+def _run_chunks_in_processes(chunks, reference, progress_callback=None):
+    """常驻进程池处理各数据块（数据块按列打包传输，空闲进程依次领取下一块），按原顺序返回 (各块新增的列, 各块耗时, 各块备注计数)"""
+    pool = get_process_pool(reference)
+    results = {}
+    total_chunks = len(chunks)
+    future_to_index = {submit_chunk(pool, chunk): idx for idx, chunk in enumerate(chunks)}
+    for count, future in enumerate(as_completed(future_to_index)):
+        idx = future_to_index[future]
+        results[idx] = future.result()
+        if progress_callback:
+            progress_callback(count + 1, total_chunks)
+    ordered = [results[i] for i in sorted(results.keys())]
+    return [result for result, _, _ in ordered], [seconds for _, seconds, _ in ordered], [counts for _, _, counts in ordered]
+
+
+def _assemble_columns(parts, total_rows):
+    """
+    parts 为 [(行位置数组, {列名: 数组})]，各部分的行位置合起来恰好覆盖 0..total_rows-1。
+    按列拼接并按行位置排好，返回与原数据逐行对应的 {列名: 数组}；每拼好一列即释放各部分的该列。
+    """
+    positions = np.concatenate([rows for rows, _ in parts]) if parts else np.empty(0, dtype=np.intp)
+    if len(positions) != total_rows:
+        raise Exception(f"各数据块结果共 {len(positions)} 行，与原数据 {total_rows} 行不一致")
+    order = None if (np.diff(positions) > 0).all() else np.argsort(positions, kind='stable')
+    derived = {}
+    for col in dict.fromkeys(col for _, columns in parts for col in columns):
+        pieces = [pd.Series(part.pop(col) if col in part else np.full(len(rows), '', dtype=object))
+                  for rows, part in parts]
+        values = pd.concat(pieces, ignore_index=True).array
+        derived[col] = values if order is None else values.take(order)
+    return derived
+
+
+def _row_cache_context(df, reference, detector):
+    """
+    按行结果缓存的上下文：处理规则、参考数据版本、备注字典、参与指纹的列或词级错别字检测是否可用变化时缓存作废
+    （jieba 加载失败时缓存的行没有疑似错别字标记，之后 jieba 可用时不能复用）
+    """
+    columns = tuple((str(col), str(df[col].dtype)) for col in df.columns)
+    return (ROW_CACHE_FORMAT, reference.version, remark_dictionaries_digest(), columns, detector is not None)
+
+
+def _reusable_rows(df, row_cache, row_hashes, reference):
+    """
+    可直接复用缓存结果的行（bool 数组）。学校别名解析依赖别名索引，上次处理后又学到了新别名时
+    结果可能不同，这些行重新解析一次别名，结果有变化的行重新处理。
+    """
+    reused = row_cache.lookup(row_hashes) >= 0
+    if reused.any() and '学校别名解析' in row_cache.columns:
+        cached = row_cache.take(row_cache.lookup(row_hashes[reused]), df.index[reused])
+        current = resolve_school_aliases(df.loc[reused, '院校原始名称'], cached['学校匹配结果'], reference)
+        reused[reused] = (current == cached['学校别名解析']).to_numpy()
+    return reused
+
+
+def process_remarks_file(file_path, progress_callback=None, stats=None, executor=None, chunk_stats=None):
+    """
+    学业桥数据处理：上传文件第1行为标题，校验指定列；校对学校/专业/备注后按新格式导出。
+    传入 stats（dict）时写入本次处理的统计信息，供页面展示。
+    executor 为 'process'（常驻进程池，进程数见 process_pool_workers）或 'thread'（线程池），
+    默认多核且不是打包后的程序时用进程池；进程池无法使用时自动改用线程池。
+    传入 chunk_stats（list）时追加每个数据块的 起始行、行数、估计开销、耗时（秒），用于调整数据块划分参数。
+    """
+    import openpyxl
+    from openpyxl.styles import Alignment, numbers
+
+    try:
+        # 上传文件从第一行（标题行）开始读取
+        df = pd.read_excel(file_path, header=0, dtype={
+            '招生代码': str,
+            '专业组编号': str,
+            '专业代码': str,
+        }, engine='openpyxl', keep_default_na=False)
+    except Exception as e:
+        raise Exception(f"读取文件错误：{e}")
+    # 校验必须包含的列（学业桥上传格式）
+    missing = [c for c in XUEYEQIAO_UPLOAD_COLUMNS if c not in df.columns]
+    if missing:
+        raise Exception("上传文件缺少以下列（应从第1行标题开始）：%s。当前列名：%s" % (missing, list(df.columns)))
+    for col in ['招生代码', '专业组编号', '专业代码']:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    # 整个任务固定使用同一版本的参考数据，处理过程中发生热更新也不影响本次结果
+    reference = get_reference_data()
+    # 词级错别字检测器（jieba 加载失败时为 None），整个任务只获取一次，线程池模式下传给各数据块
+    detector = get_word_typo_detector(reference)
+    if stats is None:
+        stats = {}
+    # 按 process_chunk 读取的列计算每行指纹；与上次处理相同的行直接复用缓存结果，只处理新增或修改过的行
+    inputs = df[process_chunk_input_columns(df)]
+    row_hashes = fingerprint_rows(inputs)
+    row_cache = RowResultCache.load(_row_cache_context(inputs, reference, detector))
+    reused = _reusable_rows(df, row_cache, row_hashes, reference)
+    stats['复用缓存行数'] = int(reused.sum())
+    # 未复用的行中输入列完全相同的行只处理一次（如同一专业在多个招生类型下列出），结果再展开到各重复行
+    pending_positions = np.flatnonzero(~reused)
+    pending_codes, _ = pd.factorize(row_hashes[pending_positions])
+    _, distinct = np.unique(pending_codes, return_index=True)
+    if len(pending_positions):
+        stats['重复行比例'] = f"{1 - len(distinct) / len(pending_positions):.0%}"
+        logging.info(f"待处理 {len(pending_positions)} 行，去重后 {len(distinct)} 行")
+    # 各块只返回新增的列，按行位置拼成与 df 逐行对应的列后直接加到 df 上，不复制、拼接整个数据块
+    pending = df.iloc[pending_positions[distinct]] if len(distinct) < len(df) else df
+    if executor == 'process' and not process_pool_supported():
+        logging.warning("打包后的程序不能使用进程池，改用线程池处理")
+        executor = 'thread'
+    if executor is None:
+        executor = 'process' if process_pool_supported() and process_pool_workers() > 1 else 'thread'
+    # 按行数、工作进程数和估计开销划分数据块；只有一块时不值得为它使用进程池
+    costs = estimate_row_costs(pending)
+    bounds = plan_chunks(costs, process_pool_workers() if executor == 'process' else os.cpu_count() or 4)
+    chunks = [pending.iloc[start:stop] for start, stop in bounds]
+    if len(chunks) <= 1:
+        executor = 'thread'
+    if executor == 'process':
+        try:
+            ordered_results, timings, chunk_counts = _run_chunks_in_processes(chunks, reference, progress_callback)
+        except BrokenProcessPool as e:
+            logging.warning(f"进程池不可用，改用线程池处理：{e}")
+            shutdown_process_pool()
+            executor = 'thread'
+    if executor == 'thread':
+        cache_before = remark_cache_stats()
+        ordered_results, timings, chunk_counts = _run_chunks_in_threads(chunks, reference, detector, progress_callback)
+        # 进程池模式下缓存在各工作进程中，只在线程池模式统计本次的备注缓存命中率
+        cache_after = remark_cache_stats()
+        hits = cache_after['hits'] - cache_before['hits']
+        lookups = hits + cache_after['misses'] - cache_before['misses']
+        if lookups:
+            stats['备注缓存命中率'] = f"{hits / lookups:.0%}"
+    stats['执行方式'] = '进程池' if executor == 'process' else '线程池'
+    # 本次处理的行（不含复用缓存的行和重复行）中，备注预筛和词级错别字预筛都未命中、不做完整检查也不分词的非空备注比例
+    remark_rows = sum(counts.get('非空备注', 0) for counts in chunk_counts)
+    if remark_rows:
+        passed_rows = sum(counts.get('备注预筛直接通过', 0) for counts in chunk_counts)
+        stats['备注预筛直接通过'] = f"{passed_rows / remark_rows:.0%}"
+    if chunks:
+        stats['数据块'] = f"{len(chunks)} 个（{min(len(c) for c in chunks)}～{max(len(c) for c in chunks)} 行）"
+        stats['数据块耗时'] = f"中位 {np.median(timings):.2f} 秒，最长 {max(timings):.2f} 秒"
+        logging.info(f"数据块耗时（秒）：{[round(t, 3) for t in timings]}")
+    if chunk_stats is not None:
+        chunk_stats.extend({'起始行': int(pending.index[start]), '行数': stop - start, '估计开销': int(costs[start:stop].sum()), '耗时': seconds}
+                           for (start, stop), seconds in zip(bounds, timings if chunks else []))
+    derived = _assemble_columns([(np.arange(start, stop), columns) for (start, stop), columns in zip(bounds, ordered_results)],
+                                len(distinct))
+    if len(distinct) < len(pending_positions):
+        derived = {col: values.take(pending_codes) for col, values in derived.items()}
+    if reused.any():
+        derived = _assemble_columns([
+            (pending_positions, derived),
+            (np.flatnonzero(reused), row_cache.take_columns(row_cache.lookup(row_hashes[reused]))),
+        ], len(df))
+    row_cache.update(row_hashes, derived)
+    for col, values in derived.items():
+        df[col] = values
+    final_result = df
+    row_cache.save()
+    # 同一学校、省份内近似重复的备注给出规范写法（需要整个文件，在合并各数据块后进行）
+    if '修改后备注' in final_result.columns:
+        groups = final_result['院校名称'].astype(str).str.strip() + '|' + final_result['省份'].astype(str).str.strip()
+        final_result['备注规范建议'] = suggest_canonical_remarks(final_result['修改后备注'], groups)
+        stats['备注规范建议'] = int((final_result['备注规范建议'] != '').sum())
+    # 别名解析命中数；从本次匹配成功的行学习新的 院校原始名称 → 院校名称 别名
+    if '学校别名解析' in final_result.columns:
+        stats['学校别名解析'] = int((final_result['学校别名解析'] != '').sum())
+        aliases = get_school_alias_index()
+        learned = aliases.learn(final_result['院校原始名称'], final_result['院校名称'], final_result['学校匹配结果'])
+        if learned:
+            aliases.save()
+        stats['新增学校别名'] = learned
+        logging.info(f"学校别名解析 {stats['学校别名解析']} 行，新增别名 {learned} 条（共 {len(aliases)} 条）")
+    # 从上传数据取招生年份（年份列第一个非空值）
+    year_value = ''
+    if '年份' in final_result.columns:
+        for v in final_result['年份']:
+            if pd.notna(v) and str(v).strip():
+                year_value = str(v).strip()
+                break
+    # 按列映射为导出格式（含 process_chunk 产生的修改后备注等）
+    export_df = build_export_frame(final_result).reset_index(drop=True)
+    # 最高分、最低分、平均分：仅数字保留小数后两位
+    def _format_score(x):
+        if x is None or (isinstance(x, str) and not x.strip()):
+            return ''
+        s = str(x).strip()
+        if not s or not _is_numeric_str(s):
+            return s
+        return '%.2f' % float(s)
+    for col in ['最高分', '最低分', '平均分']:
+        if col in export_df.columns:
+            export_df[col] = map_unique(_format_score, export_df[col])
+    output_path = file_path.replace('.xlsx', '_检查结果.xlsx')
+    try:
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'Sheet1'
+        # 第1行：A1-U1 合并，行高 220 磅，备注内容
+        ws.merge_cells('A1:U1')
+        ws['A1'] = XUEYEQIAO_EXPORT_NOTE
+        ws['A1'].alignment = Alignment(wrap_text=True, vertical='top', horizontal='left')
+        ws.row_dimensions[1].height = 220
+        # 第2行：A2=招生年份，B2=年份
+        ws['A2'] = '招生年份'
+        ws['B2'] = year_value
+        # 第3行：标题行
+        for col_idx, col_name in enumerate(XUEYEQIAO_EXPORT_HEADERS, start=1):
+            ws.cell(row=3, column=col_idx, value=col_name)
+        # 第4行起：数据
+        for row_idx, (_, row_data) in enumerate(export_df.iterrows(), start=4):
+            for col_idx, col_name in enumerate(XUEYEQIAO_EXPORT_HEADERS, start=1):
+                val = row_data.get(col_name)
+                if pd.isna(val):
+                    val = ''
+                ws.cell(row=row_idx, column=col_idx, value=val)
+        # 专业组代码、专业代码、招生代码等列为文本格式
+        text_cols = ['专业组代码', '专业代码', '招生代码', '最低分位次（选填）', '招生人数（选填）', '最低分数区间低', '最低分数区间高', '最低分数区间位次低', '最低分数区间位次高', '录取人数（选填）']
+        for col_name in text_cols:
+            if col_name in XUEYEQIAO_EXPORT_HEADERS:
+                col_idx = XUEYEQIAO_EXPORT_HEADERS.index(col_name) + 1
+                for r in range(4, len(export_df) + 4):
+                    cell = ws.cell(row=r, column=col_idx)
+                    if cell.value is not None and str(cell.value).strip() != '':
+                        cell.number_format = numbers.FORMAT_TEXT
+        _write_result_sheet(wb, reference.version, [
+            final_result[col].tolist() if col in final_result.columns else [''] * len(final_result)
+            for col in RESULT_COLUMNS])
+        wb.save(output_path)
+    except Exception as e:
+        raise Exception(f"保存文件错误：{e}")
+    return output_path
+
+
+def _write_result_sheet(wb, version, columns):
+    """写入（或覆盖）隐藏的校验信息表：A1/B1 为参考数据版本，第3行标题，第4行起与 Sheet1 数据行一一对应"""
+    if RESULT_SHEET in wb.sheetnames:
+        del wb[RESULT_SHEET]
+    info = wb.create_sheet(RESULT_SHEET)
+    info.sheet_state = 'hidden'
+    info['A1'] = '参考数据版本'
+    info['B1'] = version
+    for col_idx, col_name in enumerate(RESULT_COLUMNS, start=1):
+        info.cell(row=3, column=col_idx, value=col_name)
+        for row_idx, value in enumerate(columns[col_idx - 1], start=4):
+            info.cell(row=row_idx, column=col_idx, value=value)
+
+
+def _unmatched_with_added_prefix(majors, added_combos):
+    """不匹配的专业中，括号统一后以某个新增专业名称开头的（可能因新增专业而变为匹配，含前缀匹配）"""
+    trie = PrefixTrie((normalize_major_brackets(split_major_combo(combo)[0]), True) for combo in added_combos)
+    normalized = majors.map(normalize_major_brackets)
+    hits = {name: bool(trie.prefixes(name)) for name in normalized.unique()}
+    return normalized.map(hits).astype(bool)
+
+
+def _suggests_removed(suggestions, removed):
+    """建议列（"；"连接）中含已删除名称的行"""
+    texts = suggestions.astype(str)
+    hits = {text: not removed.isdisjoint(text.split('；')) for text in texts.unique()}
+    return texts.map(hits).astype(bool)
+
+
+def _near_added_schools(names, added):
+    """与某个新增学校的相似度达到建议门槛的名称（新增学校可能出现在学校名称建议中）"""
+    index = BigramIndex(added)
+    names = names.astype(str).str.strip()
+    hits = {name: bool(index.suggest(name, 1)) for name in names.unique()}
+    return names.map(hits).astype(bool)
+
+
+def _near_added_majors(majors, added_combos):
+    """与某个新增专业名称的编辑距离在建议范围内的专业（含同名专业新增了层次），原因和建议可能变化"""
+    tree = BKTree(sorted({split_major_combo(combo)[0] for combo in added_combos}))
+    hits = {major: bool(major) and bool(tree.search(major, MajorIndex._max_distance(major))) for major in majors.unique()}
+    return majors.map(hits).astype(bool)
+
+
+def revalidate_remarks_file(file_path, stats=None):
+    """
+    按参考数据更新重新校验学业桥导出的检查结果文件，无需重新处理原始上传文件。
+    取文件中记录的参考数据版本与当前版本的集合差，只重新校验结论可能变化的行：
+    原来"不匹配"且名称在新增集合中（专业含前缀匹配）的行，原来"匹配"且名称（或前缀匹配的专业）已被删除的行，
+    别名解析结果已被删除的行，按前缀匹配上、完整名称新增了的专业行，以及建议可能变化的不匹配行
+    （建议中有已删除的名称，或与某个新增名称相近）。重新校验的行同时更新学校别名解析、学校名称建议和专业的前缀匹配、原因、建议，
+    其余单元格保持不变；写入新文件并返回路径。
+    传入 stats（dict）时写入统计信息。
+    """
+    import openpyxl
+
+    try:
+        wb = openpyxl.load_workbook(file_path)
+    except Exception as e:
+        raise Exception(f"读取文件错误：{e}")
+    if RESULT_SHEET not in wb.sheetnames:
+        raise Exception("文件中没有校验信息（参考数据版本），请对原始上传文件重新进行学业桥数据处理")
+    ws = wb.worksheets[0]
+    info = wb[RESULT_SHEET]
+    old_version = info['B1'].value
+    old = load_reference_version(old_version)
+    if old is None:
+        raise Exception(f"找不到参考数据版本 {old_version} 的记录，请对原始上传文件重新进行学业桥数据处理")
+    reference = get_reference_data()
+
+    headers = [c.value for c in ws[3]]
+    rows = list(ws.iter_rows(min_row=4, max_row=ws.max_row, max_col=len(headers), values_only=True))
+    df = pd.DataFrame(rows, columns=headers).fillna('')
+    verdicts = list(info.iter_rows(min_row=4, max_row=3 + len(df), max_col=len(RESULT_COLUMNS), values_only=True))
+    verdicts += [(None,) * len(RESULT_COLUMNS)] * (len(df) - len(verdicts))
+    for col_idx, col_name in enumerate(RESULT_COLUMNS):
+        df[col_name] = [v[col_idx] or '' for v in verdicts]
+
+    diff = diff_reference_versions(old, reference)
+    schools = df['学校名称'].astype(str).str.strip()
+    school_unmatched = df['学校匹配结果'] == '不匹配'
+    school_mask = ((school_unmatched & schools.isin(diff['school_added']))
+                   | ((df['学校匹配结果'] == '匹配') & schools.isin(diff['school_removed']))
+                   | df['学校别名解析'].astype(str).isin(diff['school_removed'])
+                   # 不匹配行的建议：与完整处理一致，不保留已删除的学校，也不漏掉相近的新增学校
+                   | (school_unmatched & _suggests_removed(df['学校名称建议'], diff['school_removed']))
+                   | (school_unmatched & _near_added_schools(schools, diff['school_added'])))
+    majors = df['招生专业'].astype(str).str.strip()
+    levels = df['一级层次'].astype(str).str.strip()
+    prefix_combos = df['招生专业前缀匹配'].astype(str) + levels
+    prefix_matched = (df['招生专业匹配结果'] == '匹配') & (df['招生专业前缀匹配'].astype(str) != '')
+    major_mask = (((df['招生专业匹配结果'] == '不匹配') & _unmatched_with_added_prefix(majors, diff['major_added']))
+                  | ((df['招生专业匹配结果'] == '匹配')
+                     & ((majors + levels).isin(diff['major_removed']) | prefix_combos.isin(diff['major_removed'])))
+                  # 按前缀匹配上的专业，完整名称新增后应直接匹配，前缀匹配列需要清空
+                  | (prefix_matched & (majors + levels).isin(diff['major_added']))
+                  # 不匹配行的原因和建议：建议中有已删除的专业，或与某个新增专业名称相近
+                  | ((df['招生专业匹配结果'] == '不匹配')
+                     & (_suggests_removed(df['招生专业建议'], diff['major_removed'])
+                        | _near_added_majors(majors, diff['major_added']))))
+
+    updated = df.copy()
+    if school_mask.any():
+        sub = df.loc[school_mask, ['学校名称']].copy()
+        _check_schools(sub, '学校名称', reference)
+        updated.loc[school_mask, ['学校匹配结果', '学校名称建议']] = sub[['学校匹配结果', '学校名称建议']]
+        # 导出文件中没有院校原始名称，不能重新解析别名：现在匹配的行清空；仍不匹配的行只保留仍是有效学校的别名，
+        # 有别名的行与处理时一样不给学校名称建议
+        aliases = updated['学校别名解析'].astype(str)
+        stale = school_mask & ((updated['学校匹配结果'] == '匹配') | ~aliases.isin(reference.school_names))
+        updated.loc[stale, '学校别名解析'] = ''
+        updated.loc[school_mask & (updated['学校别名解析'] != ''), '学校名称建议'] = ''
+    if major_mask.any():
+        sub = df.loc[major_mask, ['招生专业', '一级层次']].copy()
+        _check_majors(sub, '招生专业', reference)
+        major_columns = ['招生专业匹配结果', '招生专业前缀匹配', '招生专业不匹配原因', '招生专业建议']
+        updated.loc[major_mask, major_columns] = sub[major_columns]
+
+    # 只改写有变化的单元格
+    changed_rows = set()
+    for col_name in ['学校别名解析', '学校名称建议', '招生专业前缀匹配', '招生专业不匹配原因', '招生专业建议']:
+        col_idx = headers.index(col_name) + 1
+        for i in updated.index[(updated[col_name] != df[col_name]) & (school_mask | major_mask)]:
+            ws.cell(row=4 + i, column=col_idx, value=updated.at[i, col_name])
+    for col_name in RESULT_COLUMNS:
+        changed_rows.update(updated.index[updated[col_name] != df[col_name]])
+    _write_result_sheet(wb, reference.version, [updated[col].tolist() for col in RESULT_COLUMNS])
+
+    if stats is None:
+        stats = {}
+    stats['参考数据版本'] = f"{old_version} → {reference.version}"
+    stats['新增学校'] = len(diff['school_added'])
+    stats['删除学校'] = len(diff['school_removed'])
+    stats['新增专业'] = len(diff['major_added'])
+    stats['删除专业'] = len(diff['major_removed'])
+    stats['重新校验行数'] = int((school_mask | major_mask).sum())
+    stats['结果变化行数'] = len(changed_rows)
+    logging.info(f"重新校验 {file_path}：{stats}")
+
+    output_path = file_path.replace('.xlsx', '_重新校验.xlsx')
+    try:
+        wb.save(output_path)
+    except Exception as e:
+        raise Exception(f"保存文件错误：{e}")
+    return output_path
+
+
+def _is_numeric_str(s):
+    """判断字符串是否为数字（含小数）"""
+    try:
+        float(s)
+        return True
+    except (ValueError, TypeError):
+        return False